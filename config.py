@@ -2,13 +2,21 @@
 Configuration file for ZeoFill Dashboard
 """
 
+import os
+import functools
+import types
+from datetime import timedelta
+from enum import IntEnum
+from typing import Mapping, NamedTuple, Tuple
+
 # Supabase Configuration
 SUPABASE_CONFIG = {
-    'url': '',  # Set via environment variable SUPABASE_URL
-    'key': '',  # Set via environment variable SUPABASE_KEY
+    'url': os.environ.get('SUPABASE_URL', ''),  # Resolved once at import
+    'key': os.environ.get('SUPABASE_KEY', ''),  # Resolved once at import
     'shopify_table': 'Shopify_OrderData',
     'walmart_table': 'Walmart_OrderData',
-    'amazon_table': 'Amazon_OrderData'
+    'amazon_table': 'Amazon_OrderData',
+    'max_rows_per_request': 1000  # Match the project's API "Max rows" setting
 }
 
 # Legacy Google Sheets Configuration (deprecated - use Supabase instead)
@@ -35,11 +43,31 @@ DASHBOARD_CONFIG = {
 # Data Refresh Settings
 CACHE_CONFIG = {
     'ttl_seconds': 300,  # 5 minutes
-    'auto_refresh': False
+    'auto_refresh': False,
+    # Local Parquet copies of fetched orders, which include customer names and
+    # addresses unencrypted - opt in with ZEOFILL_DISK_CACHE=1
+    'disk_cache_enabled': os.environ.get('ZEOFILL_DISK_CACHE', '').lower() in ('1', 'true', 'yes'),
+    'disk_cache_dir': os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')  # Parquet copies of fetched data
 }
 
 # Channel Configuration
-CHANNELS = ['Shopify', 'Walmart', 'Amazon']
+CHANNELS = ('Shopify', 'Walmart', 'Amazon')
+
+
+class Channel(IntEnum):
+    """Sales channels, in the same order as CHANNELS and CHANNEL_TABLES."""
+    SHOPIFY = 0
+    WALMART = 1
+    AMAZON = 2
+
+
+# Order table per channel, indexed by Channel
+CHANNEL_TABLES = tuple(SUPABASE_CONFIG[f'{c.name.lower()}_table'] for c in Channel)
+
+
+def channel_table(channel: Channel) -> str:
+    """Return the Supabase order table name for a channel."""
+    return CHANNEL_TABLES[channel]
 
 # Metrics Configuration
 METRICS = {
@@ -65,6 +93,14 @@ METRICS = {
     }
 }
 
+# Metric lookup tables derived from METRICS once at import, for code that
+# needs to group metrics by format or list them in display order without
+# walking each metric's nested dict
+_CURRENCY_METRICS = frozenset(k for k, v in METRICS.items() if v['format'] == 'currency')
+_NUMBER_METRICS = frozenset(k for k, v in METRICS.items() if v['format'] == 'number')
+METRIC_ORDER = ('revenue', 'profit', 'orders', 'aov')
+DISPLAY_NAMES = tuple(METRICS[k]['display_name'] for k in METRIC_ORDER)
+
 # Date Range Presets
 DATE_PRESETS = {
     'Last 7 Days': 7,
@@ -74,6 +110,9 @@ DATE_PRESETS = {
     'Last Year': 365
 }
 
+# Date range presets as ready-to-use offsets (DATE_PRESETS kept for display)
+DATE_PRESET_DELTAS = {label: timedelta(days=days) for label, days in DATE_PRESETS.items()}
+
 # Feature Flags
 FEATURES = {
     'enable_supabase': True,
@@ -82,3 +121,72 @@ FEATURES = {
     'enable_export': True,
     'enable_email_reports': False
 }
+
+# Freeze configuration - these values are read on every render and never
+# written at runtime, so expose read-only views instead of mutable dicts
+SUPABASE_CONFIG = types.MappingProxyType(SUPABASE_CONFIG)
+GOOGLE_SHEETS_CONFIG = types.MappingProxyType(GOOGLE_SHEETS_CONFIG)
+DASHBOARD_CONFIG = types.MappingProxyType({
+    **DASHBOARD_CONFIG,
+    'theme': types.MappingProxyType(DASHBOARD_CONFIG['theme'])
+})
+CACHE_CONFIG = types.MappingProxyType(CACHE_CONFIG)
+METRICS = types.MappingProxyType({
+    key: types.MappingProxyType(metric) for key, metric in METRICS.items()
+})
+DATE_PRESETS = types.MappingProxyType(DATE_PRESETS)
+DATE_PRESET_DELTAS = types.MappingProxyType(DATE_PRESET_DELTAS)
+FEATURES = types.MappingProxyType(FEATURES)
+
+
+class AppConfig(NamedTuple):
+    """Read-only snapshot of the dashboard configuration."""
+    supabase: Mapping
+    dashboard: Mapping
+    cache: Mapping
+    channels: Tuple[str, ...]
+    channel_tables: Tuple[str, ...]
+    metrics: Mapping
+    date_presets: Mapping
+    date_preset_deltas: Mapping
+    features: Mapping
+
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> AppConfig:
+    """
+    Validate the configuration and return it as an AppConfig.
+
+    Validation runs once per process; Streamlit reruns get the cached
+    snapshot back.
+
+    Supabase credentials are not checked here: they may be blank, in which
+    case the dashboard runs on sample data.
+
+    Raises:
+        ValueError: If a metric, channel or cache setting is invalid
+    """
+    if len(CHANNELS) != len(Channel):
+        raise ValueError("CHANNELS must list one name per Channel member")
+
+    for name, metric in METRICS.items():
+        if metric.get('format') not in ('currency', 'number'):
+            raise ValueError(f"Metric '{name}' has unknown format: {metric.get('format')!r}")
+
+    if not isinstance(SUPABASE_CONFIG['max_rows_per_request'], int) or SUPABASE_CONFIG['max_rows_per_request'] <= 0:
+        raise ValueError("SUPABASE_CONFIG['max_rows_per_request'] must be a positive integer")
+
+    if not isinstance(CACHE_CONFIG['ttl_seconds'], int) or CACHE_CONFIG['ttl_seconds'] <= 0:
+        raise ValueError("CACHE_CONFIG['ttl_seconds'] must be a positive integer")
+
+    return AppConfig(
+        supabase=SUPABASE_CONFIG,
+        dashboard=DASHBOARD_CONFIG,
+        cache=CACHE_CONFIG,
+        channels=CHANNELS,
+        channel_tables=CHANNEL_TABLES,
+        metrics=METRICS,
+        date_presets=DATE_PRESETS,
+        date_preset_deltas=DATE_PRESET_DELTAS,
+        features=FEATURES
+    )
@@ -20,21 +20,87 @@ Table Structure:
           item-price, item-tax, shipping-price, order-status, etc.
 """
 
+import json
+import logging
+import os
+import re
+import time
+import httpx
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
-from supabase import create_client, Client
-from typing import Optional
-import os
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from supabase import create_client, Client, ClientOptions
+from typing import Callable, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import wraps
 from datetime import datetime
+from config import CHANNELS, Channel, channel_table, get_config
 
 # Table names in Supabase
-SHOPIFY_TABLE = "Shopify_OrderData"
-WALMART_TABLE = "Walmart_OrderData"
-AMAZON_TABLE = "Amazon_OrderData"
+SHOPIFY_TABLE = channel_table(Channel.SHOPIFY)
+WALMART_TABLE = channel_table(Channel.WALMART)
+AMAZON_TABLE = channel_table(Channel.AMAZON)
 SHOPIFY_FEES_TABLE = "Shopify_Fees"
 WALMART_FEES_TABLE = "Walmart_Fees"
 AMAZON_FEES_TABLE = "Amazon_Fees"
 
+# Rows requested per page - the project's API max-rows setting (1000 by default)
+PAGE_SIZE = get_config().supabase['max_rows_per_request']
+FETCH_WORKERS = 8
+# Unique, indexed column that gives parallel pages one fixed row order
+PAGE_KEY = 'id'
+
+# Arrow-backed strings: one contiguous buffer per column instead of a Python
+# object per cell. Missing values are NaN, so comparisons stay plain booleans.
+_STR = pd.StringDtype("pyarrow", na_value=np.nan)
+
+# Order table columns read by the transforms - only these are fetched
+CHANNEL_COLUMNS = {
+    'Shopify': (
+        'order_id', 'order_number', 'created_at', 'order_total_price', 'line_total',
+        'line_tax', 'line_shipping', 'weight', 'weight_lbs', 'state', 'product_name',
+        'financial_status', 'fulfillment_status', 'shipping_terms', 'customer_name',
+        'shipping_address', 'shipping_city', 'shipping_zipcode', 'line_discount', 'discount'
+    ),
+    'Walmart': (
+        'order_id', 'created_at', 'line_total', 'line_tax', 'line_shipping', 'state',
+        'product_name', 'financial_status', 'fulfillment_status', 'shipping_terms',
+        'customer_name', 'shipping_address', 'shipping_city', 'shipping_zipcode',
+        'line_discount', 'discount'
+    ),
+    'Amazon': (
+        'amazon-order-id', 'purchase-date', 'item-price', 'item-tax', 'shipping-tax',
+        'shipping-price', 'ship-state', 'product-name', 'order-status', 'recipient-name',
+        'ship-address', 'ship-city', 'ship-postal-code', 'item-promotion-discount',
+        'ship-promotion-discount'
+    )
+}
+
+
+logger = logging.getLogger(__name__)
+
+
+# Pooled sockets shared by every request: FETCH_WORKERS pages per channel
+# across the three concurrent channel fetches, plus the fee lookups
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+HTTP_TIMEOUT = httpx.Timeout(120)  # Same as the postgrest client default
+
+
+@st.cache_resource(show_spinner=False)
+def _create_client_cached(supabase_url: str, supabase_key: str) -> Client:
+    """
+    Create the Supabase client once per process and reuse it across fetches.
+
+    Keeps a single HTTP connection pool (and its TLS sessions) alive across
+    reruns instead of rebuilding it for every table request.
+    """
+    http_client = httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    return create_client(supabase_url, supabase_key, options=ClientOptions(httpx_client=http_client))
+
+
 def get_supabase_client() -> Optional[Client]:
     """
     Initialize and return Supabase client.
@@ -49,16 +115,17 @@ def get_supabase_client() -> Optional[Client]:
     try:
         supabase_url = None
         supabase_key = None
+        supabase_config = get_config().supabase
 
         # Method 1: Try Streamlit secrets first (recommended for production)
         if "supabase" in st.secrets:
             supabase_url = st.secrets["supabase"]["url"]
             supabase_key = st.secrets["supabase"]["key"]
 
-        # Method 2: Try environment variables
-        elif "SUPABASE_URL" in os.environ and "SUPABASE_KEY" in os.environ:
-            supabase_url = os.getenv("SUPABASE_URL")
-            supabase_key = os.getenv("SUPABASE_KEY")
+        # Method 2: Try environment variables (resolved once in config.py)
+        elif supabase_config['url'] and supabase_config['key']:
+            supabase_url = supabase_config['url']
+            supabase_key = supabase_config['key']
 
         # No credentials found
         else:
@@ -87,8 +154,8 @@ def get_supabase_client() -> Optional[Client]:
             """)
             return None
 
-        # Create and return client
-        client: Client = create_client(supabase_url, supabase_key)
+        # Create (or reuse) and return client
+        client: Client = _create_client_cached(supabase_url, supabase_key)
         return client
 
     except Exception as e:
@@ -96,6 +163,333 @@ def get_supabase_client() -> Optional[Client]:
         return None
 
 
+def _thread_pool(max_workers: int) -> ThreadPoolExecutor:
+    """
+    Create a thread pool whose workers share the current Streamlit script context.
+
+    Without the context, st.info/st.warning calls made by the fetch
+    functions would be dropped when they run off the main thread.
+    """
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        initializer=add_script_run_ctx,
+        initargs=(None, get_script_run_ctx())
+    )
+
+
+def _fetch_in_background(fetch: Callable, *args) -> Future:
+    """Start fetch(*args) on a worker thread and return its Future."""
+    pool = _thread_pool(max_workers=1)
+    future = pool.submit(fetch, *args)
+    pool.shutdown(wait=False)
+    return future
+
+
+def _page_key(table_columns: list) -> Optional[str]:
+    """PAGE_KEY if the table has it, else None (pages are then read one at a time)."""
+    return PAGE_KEY if PAGE_KEY in table_columns else None
+
+
+def _paginated_fetch(
+    client: Client,
+    table_name: str,
+    columns: str = '*',
+    filters: list = (),
+    key: Optional[str] = None,
+    page_size: int = PAGE_SIZE,
+    workers: int = FETCH_WORKERS
+) -> Optional[pd.DataFrame]:
+    """
+    Fetch every matching row of a table, requesting pages in parallel.
+
+    A HEAD request with count='exact' gives the row total up front, so all
+    .range() pages can be requested concurrently instead of one after another.
+    Pages are the hot path, so they go straight to the PostgREST endpoint over
+    the client's pooled session and the body is decoded with orjson. Each page
+    is converted to an Arrow table as it arrives and the pages are
+    concatenated once, so rows never pile up as a list of Python dicts.
+
+    Concurrent OFFSET pages only partition the rows exactly under a unique
+    order, so pages are ordered by key and fetched in parallel only when one
+    is given. Without it they are read one after another, as before.
+
+    Args:
+        client: Supabase client
+        table_name: Name of the table
+        columns: Select clause
+        filters: (column, operator, criteria) tuples applied to every request
+        key: Unique, indexed column to order pages by (see _page_key), or None
+        page_size: Rows per request
+        workers: Number of pages fetched concurrently
+
+    Returns:
+        DataFrame of all matching rows, or None if no rows match
+    """
+    def build_query(**select_kwargs):
+        query = client.table(table_name).select(columns, **select_kwargs)
+        for column, operator, criteria in filters:
+            query = query.filter(column, operator, criteria)
+        return query
+
+    total = build_query(count='exact', head=True).execute().count or 0
+    if total == 0:
+        return None
+
+    # Same request the query builder would send, minus its response model
+    postgrest = client.postgrest
+    url = f"{postgrest.base_url}/{table_name}"
+    headers = dict(postgrest.headers)
+    params = [('select', columns)] + [
+        (column, f"{operator}.{criteria}") for column, operator, criteria in filters
+    ]
+    if key:
+        params.append(('order', f'{key}.asc'))
+
+    def fetch_page(offset: int) -> list:
+        expected = min(page_size, total - offset)
+        rows = []
+        # If the server's max-rows cap is below page_size it silently returns
+        # a short page; keep reading from where it stopped so no rows are skipped
+        while len(rows) < expected:
+            response = postgrest.session.get(
+                url,
+                params=params + [('offset', offset + len(rows)), ('limit', expected - len(rows))],
+                headers=headers
+            )
+            response.raise_for_status()
+            batch = orjson.loads(response.content)
+            if not batch:
+                break
+            rows.extend(batch)
+        return rows
+
+    page_tables = []
+    with _thread_pool(max_workers=workers if key else 1) as executor:
+        # map() yields pages in offset order
+        for page in executor.map(fetch_page, range(0, total, page_size)):
+            if page:
+                page_tables.append(pa.Table.from_pylist(page))
+
+    if not page_tables:
+        return None
+
+    # Column types are inferred per page; a column that is all-null on one
+    # page is promoted to the type seen on the others
+    table = pa.concat_tables(page_tables, promote_options='permissive')
+    return table.to_pandas(types_mapper={pa.string(): _STR}.get)
+
+
+def get_table_columns(client: Client, table_name: str) -> list:
+    """
+    Get the column names of a Supabase table by probing one row.
+
+    Args:
+        client: Supabase client
+        table_name: Name of the table
+
+    Returns:
+        List of column names, or an empty list if the table has no rows
+    """
+    response = client.table(table_name).select('*').limit(1).execute()
+
+    if not response.data:
+        return []
+
+    return list(response.data[0].keys())
+
+
+def get_available_columns(table_columns: list, channel: str) -> list:
+    """
+    Get the CHANNEL_COLUMNS entries that exist in a table.
+
+    Optional columns (e.g. weight vs weight_lbs) differ between tables, and
+    PostgREST rejects unknown columns, so only probed ones are selected.
+
+    Args:
+        table_columns: Column names from get_table_columns
+        channel: 'Shopify', 'Walmart' or 'Amazon'
+
+    Returns:
+        List of column names, or an empty list if the table has no rows
+    """
+    return [col for col in CHANNEL_COLUMNS[channel] if col in table_columns]
+
+
+def build_select_clause(columns: list) -> str:
+    """Join column names for select(), quoting hyphenated Amazon names."""
+    return ','.join(f'"{col}"' if '-' in col else col for col in columns)
+
+
+# Currency formatting stripped from Amazon money columns (e.g. "$1,234.56")
+_MONEY_RE = re.compile(r'[\$,\s]')
+
+
+def _to_money(series: pd.Series) -> pd.Series:
+    """Convert a currency-formatted column to floats in one pass, with 0 for blanks."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.fillna(0)
+    cleaned = series.astype(str).str.replace(_MONEY_RE, '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce').fillna(0)
+
+
+def _num(df: pd.DataFrame, col: str, default: float = 0.0) -> np.ndarray:
+    """
+    Return a column as a float64 array, with default for missing or non-numeric values.
+
+    Columns that already arrive as numbers skip the slow errors='coerce' parse.
+    """
+    series = df[col]
+    if pd.api.types.is_numeric_dtype(series):
+        return series.fillna(default).to_numpy(dtype=np.float64)
+    return pd.to_numeric(series, errors='coerce').fillna(default).to_numpy(dtype=np.float64)
+
+
+def _const_str(df: pd.DataFrame, value: Optional[str]) -> pd.Series:
+    """Build a constant string column aligned to df (used for missing source columns)."""
+    return pd.Series(value, index=df.index, dtype=_STR)
+
+
+def _strip(series: pd.Series) -> pd.Series:
+    """Arrow-backed string column with surrounding whitespace removed."""
+    return series.astype(_STR).str.strip()
+
+
+def _strip_lower(series: pd.Series) -> pd.Series:
+    """Stripped, lower-cased string column."""
+    return _strip(series).str.lower()
+
+
+def _clean_state(series: pd.Series) -> pd.Series:
+    """Upper-cased state codes, with blank/null states as 'Unknown'."""
+    return _strip(series).str.upper().replace(['', 'NAN', 'NONE'], 'Unknown').fillna('Unknown')
+
+
+# Text columns copied from the raw tables: (output, source, convert, default
+# used when the source column is missing)
+SHOPIFY_WALMART_TEXT_COLUMNS = (
+    ('state', 'state', _clean_state, 'Unknown'),  # Geographic heatmap
+    ('products', 'product_name', _strip, 'ZeoFill Product'),
+    ('financial_status', 'financial_status', _strip_lower, 'paid'),  # Refund tracking
+    ('fulfillment_status', 'fulfillment_status', _strip, 'fulfilled'),  # Unfulfilled orders tracking
+    ('shipping_terms', 'shipping_terms', _strip, None),  # Shopify unfulfilled tracking
+    ('customer_name', 'customer_name', _strip, 'N/A'),
+    ('shipping_address', 'shipping_address', _strip, 'N/A'),
+    ('shipping_city', 'shipping_city', _strip, 'N/A'),
+    ('shipping_zipcode', 'shipping_zipcode', _strip, 'N/A')
+)
+
+AMAZON_PRODUCT_COLUMNS = (
+    ('state', 'ship-state', _clean_state, 'Unknown'),
+    ('products', 'product-name', _strip, 'Amazon Product')
+)
+
+AMAZON_CONTACT_COLUMNS = (
+    ('customer_name', 'recipient-name', _strip, 'N/A'),
+    ('shipping_address', 'ship-address', _strip, 'N/A'),
+    ('shipping_city', 'ship-city', _strip, 'N/A'),
+    ('shipping_zipcode', 'ship-postal-code', _strip, 'N/A')
+)
+
+
+def _map_text_columns(df: pd.DataFrame, spec: tuple, cols: dict) -> None:
+    """Fill cols from a text column spec; sources missing from df get the default."""
+    available = set(df.columns)
+    for output, source, convert, default in spec:
+        cols[output] = convert(df[source]) if source in available else _const_str(df, default)
+
+
+# Low-cardinality text columns, stored as categoricals (small integer codes
+# plus a dictionary of distinct values)
+CATEGORY_COLUMNS = ('state', 'products', 'financial_status', 'fulfillment_status', 'order_status')
+
+
+def _categorize(cols: dict, channel: str) -> None:
+    """
+    Convert the low-cardinality columns in cols to categoricals in place.
+
+    The channel column shares the CHANNELS categories across every channel so
+    the per-channel frames concatenate without falling back to object dtype.
+    """
+    n = len(cols['date'])
+    cols['channel'] = pd.Categorical.from_codes(
+        np.full(n, CHANNELS.index(channel), dtype=np.int8), categories=CHANNELS
+    )
+    for col in CATEGORY_COLUMNS:
+        if col in cols:
+            cols[col] = cols[col].astype('category')
+
+
+# Output dtypes shared by every transform, so the per-channel frames line up
+# block-for-block when combined (date is left as parsed)
+DASHBOARD_SCHEMA = {
+    'order_id': _STR,
+    'revenue': 'float64',
+    'shipping_cost': 'float64',
+    'tax': 'float64',
+    'state': 'category',
+    'products': 'category',
+    'financial_status': 'category',
+    'fulfillment_status': 'category',
+    'order_status': 'category',
+    'shipping_terms': _STR,
+    'customer_name': _STR,
+    'shipping_address': _STR,
+    'shipping_city': _STR,
+    'shipping_zipcode': _STR,
+    'cogs': 'float64',
+    'platform_fee': 'float64',
+    'discount': 'float64',
+    'refund_amount': 'float64',
+    'channel': pd.CategoricalDtype(CHANNELS),
+    'net_revenue': 'float64',
+    'gross_profit': 'float64',
+    'net_profit': 'float64'
+}
+
+
+def _apply_dashboard_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the DASHBOARD_SCHEMA columns present in df to their shared dtypes."""
+    schema = {col: dtype for col, dtype in DASHBOARD_SCHEMA.items() if col in df.columns}
+    return df.astype(schema, copy=False)
+
+
+def _to_dashboard_frame(cols: dict) -> pd.DataFrame:
+    """Build the transform output from cols, cast to DASHBOARD_SCHEMA."""
+    return _apply_dashboard_schema(pd.DataFrame(cols))
+
+
+def _add_profit_columns(cols: dict, discount=None) -> None:
+    """
+    Add net_revenue, gross_profit and net_profit to cols.
+
+    Each result gets one float64 buffer and every further subtraction is
+    written into it in place, so no temporaries are allocated along the way.
+
+    Args:
+        cols: Transform output columns (revenue, refund_amount, cogs,
+              shipping_cost and platform_fee must already be set)
+        discount: Optional amount also deducted from net revenue
+    """
+    def arr(value):
+        return np.asarray(value, dtype=np.float64)
+
+    # Net revenue = revenue - refunds (- discounts)
+    net_revenue = np.subtract(arr(cols['revenue']), arr(cols['refund_amount']))
+    if discount is not None:
+        np.subtract(net_revenue, arr(discount), out=net_revenue)
+
+    # Gross profit = net_revenue - COGS
+    gross_profit = np.subtract(net_revenue, arr(cols['cogs']))
+
+    # Net profit = gross_profit - shipping - platform fees
+    net_profit = np.subtract(gross_profit, arr(cols['shipping_cost']))
+    np.subtract(net_profit, arr(cols['platform_fee']), out=net_profit)
+
+    cols['net_revenue'] = net_revenue
+    cols['gross_profit'] = gross_profit
+    cols['net_profit'] = net_profit
+
+
 def transform_shopify_walmart_data(df: pd.DataFrame, channel: str) -> pd.DataFrame:
     """
     Transform Shopify/Walmart Supabase data to dashboard format.
@@ -113,29 +507,39 @@ def transform_shopify_walmart_data(df: pd.DataFrame, channel: str) -> pd.DataFra
     if df is None or df.empty:
         return None
 
-    # Create transformed DataFrame
-    transformed = pd.DataFrame()
-
     # Map date column
-    transformed['date'] = pd.to_datetime(df['created_at'], errors='coerce')
-
-    # Map order_id - use order_number for Shopify if available, otherwise use order_id
-    if 'order_number' in df.columns and channel == 'Shopify':
-        transformed['order_id'] = 'Order #' + df['order_number'].astype(str).str.strip()
-    else:
-        transformed['order_id'] = df['order_id'].astype(str).str.strip()
+    date = pd.to_datetime(df['created_at'], errors='coerce')
 
     # Map revenue
     if channel == 'Shopify':
         # Shopify: Use order_total_price (total order value)
         if 'order_total_price' in df.columns:
-            transformed['revenue'] = pd.to_numeric(df['order_total_price'], errors='coerce')
+            revenue = _num(df, 'order_total_price')
         else:
             # Fallback to line_total if order_total_price not available
-            transformed['revenue'] = pd.to_numeric(df['line_total'], errors='coerce')
+            revenue = _num(df, 'line_total')
     else:
         # Walmart and other channels: use line_total (revenue per line item)
-        transformed['revenue'] = pd.to_numeric(df['line_total'], errors='coerce')
+        revenue = _num(df, 'line_total')
+
+    # Drop rows with invalid dates or zero/negative revenue before deriving
+    # the remaining columns, so no work is spent on rows that get discarded
+    valid = date.notna().to_numpy() & (revenue > 0)
+    if not valid.any():
+        st.warning(f"⚠️ No valid data rows found for {channel}. Check that created_at has dates and line_total has numbers.")
+        return None
+    df = df.loc[valid]
+
+    # Collect output columns, then build the DataFrame in one allocation
+    cols = {'date': date[valid]}
+
+    # Map order_id - use order_number for Shopify if available, otherwise use order_id
+    if 'order_number' in df.columns and channel == 'Shopify':
+        cols['order_id'] = 'Order #' + _strip(df['order_number'])
+    else:
+        cols['order_id'] = _strip(df['order_id'])
+
+    cols['revenue'] = revenue[valid]
 
     # Map shipping cost
     if channel == 'Shopify':
@@ -148,148 +552,69 @@ def transform_shopify_walmart_data(df: pd.DataFrame, channel: str) -> pd.DataFra
             weight_col = 'weight'
 
         if weight_col:
-            def calc_shopify_shipping(weight):
-                try:
-                    w = float(weight)
-                    if w < 1:
-                        return 7.0
-                    elif w <= 5:
-                        return 12.0
-                    else:
-                        return 19.5
-                except:
-                    return 0.0
-            transformed['shipping_cost'] = df[weight_col].apply(calc_shopify_shipping)
+            # Weight tiers: < 1 lb = $7.00, 1-5 lb = $12.00, > 5 lb = $19.50
+            # Missing or non-numeric weights cost $0.00
+            w = _num(df, weight_col, default=np.nan)
+            cols['shipping_cost'] = np.select([w < 1, w <= 5, w > 5], [7.0, 12.0, 19.5], default=0.0)
         else:
-            transformed['shipping_cost'] = pd.to_numeric(df['line_shipping'], errors='coerce').fillna(0)
+            cols['shipping_cost'] = _num(df, 'line_shipping')
     elif channel == 'Walmart':
         # Walmart: Use walmart_shipping column from aggregated fee data
         if 'walmart_shipping' in df.columns:
-            transformed['shipping_cost'] = pd.to_numeric(df['walmart_shipping'], errors='coerce').fillna(0)
+            cols['shipping_cost'] = _num(df, 'walmart_shipping')
         else:
-            transformed['shipping_cost'] = pd.to_numeric(df['line_shipping'], errors='coerce').fillna(0)
+            cols['shipping_cost'] = _num(df, 'line_shipping')
     else:
-        transformed['shipping_cost'] = pd.to_numeric(df['line_shipping'], errors='coerce').fillna(0)
+        cols['shipping_cost'] = _num(df, 'line_shipping')
 
     # Map tax - use line_tax
-    transformed['tax'] = pd.to_numeric(df['line_tax'], errors='coerce').fillna(0)
-
-    # Map state column (for geographic heatmap)
-    if 'state' in df.columns:
-        transformed['state'] = df['state'].astype(str).str.strip().str.upper()
-        # Handle null/empty states
-        transformed['state'] = transformed['state'].replace(['', 'NAN', 'NONE'], 'Unknown')
-    else:
-        transformed['state'] = 'Unknown'
+    cols['tax'] = _num(df, 'line_tax')
 
-    # Products column - use product_name
-    if 'product_name' in df.columns:
-        transformed['products'] = df['product_name'].astype(str).str.strip()
-    else:
-        transformed['products'] = 'ZeoFill Product'
-
-    # Financial status (for refund tracking)
-    if 'financial_status' in df.columns:
-        transformed['financial_status'] = df['financial_status'].astype(str).str.strip().str.lower()
-    else:
-        transformed['financial_status'] = 'paid'
-
-    # Fulfillment status (for unfulfilled orders tracking)
-    if 'fulfillment_status' in df.columns:
-        transformed['fulfillment_status'] = df['fulfillment_status'].astype(str).str.strip()
-    else:
-        transformed['fulfillment_status'] = 'fulfilled'
-
-    # Shipping terms (for Shopify unfulfilled tracking)
-    if 'shipping_terms' in df.columns:
-        transformed['shipping_terms'] = df['shipping_terms'].astype(str).str.strip()
-    else:
-        transformed['shipping_terms'] = None
-
-    # Customer name
-    if 'customer_name' in df.columns:
-        transformed['customer_name'] = df['customer_name'].astype(str).str.strip()
-    else:
-        transformed['customer_name'] = 'N/A'
-
-    # Shipping address fields
-    if 'shipping_address' in df.columns:
-        transformed['shipping_address'] = df['shipping_address'].astype(str).str.strip()
-    else:
-        transformed['shipping_address'] = 'N/A'
-
-    if 'shipping_city' in df.columns:
-        transformed['shipping_city'] = df['shipping_city'].astype(str).str.strip()
-    else:
-        transformed['shipping_city'] = 'N/A'
-
-    if 'shipping_zipcode' in df.columns:
-        transformed['shipping_zipcode'] = df['shipping_zipcode'].astype(str).str.strip()
-    else:
-        transformed['shipping_zipcode'] = 'N/A'
+    # Text columns (state, product, status, customer and shipping fields)
+    _map_text_columns(df, SHOPIFY_WALMART_TEXT_COLUMNS, cols)
 
     # Calculate COGS (Cost of Goods Sold)
     # Estimate: 40% of revenue (adjust this percentage as needed)
-    transformed['cogs'] = transformed['revenue'] * 0.40
+    cols['cogs'] = cols['revenue'] * 0.40
 
     # Platform fees - use data from fee tables
     if channel == 'Shopify':
         # Shopify: Use processing_fee from Shopify_Fees table
         if 'processing_fee' in df.columns:
-            transformed['platform_fee'] = pd.to_numeric(df['processing_fee'], errors='coerce').fillna(0)
+            cols['platform_fee'] = _num(df, 'processing_fee')
         else:
             # Fallback: 2.9% + $0.30 per transaction + 3% for basic plan
-            transformed['platform_fee'] = (transformed['revenue'] * 0.059) + 0.30
+            cols['platform_fee'] = (cols['revenue'] * 0.059) + 0.30
     elif channel == 'Walmart':
         # Walmart: Use processing_fee column from aggregated fee data (SALE transactions)
         if 'processing_fee' in df.columns:
-            transformed['platform_fee'] = pd.to_numeric(df['processing_fee'], errors='coerce').fillna(0)
+            cols['platform_fee'] = _num(df, 'processing_fee')
         else:
             # Fallback: 15% referral fee (average)
-            transformed['platform_fee'] = transformed['revenue'] * 0.15
+            cols['platform_fee'] = cols['revenue'] * 0.15
     else:
         # Fallback for unknown channels
-        transformed['platform_fee'] = 0
+        cols['platform_fee'] = 0
 
     # Discounts - use line_discount column for Shopify/Walmart
     if 'line_discount' in df.columns:
-        transformed['discount'] = pd.to_numeric(df['line_discount'], errors='coerce').fillna(0)
+        cols['discount'] = _num(df, 'line_discount')
     elif 'discount' in df.columns:
-        transformed['discount'] = pd.to_numeric(df['discount'], errors='coerce').fillna(0)
+        cols['discount'] = _num(df, 'discount')
     else:
-        transformed['discount'] = 0
+        cols['discount'] = 0
 
     # Calculate refund amount based on financial_status
-    transformed['refund_amount'] = transformed.apply(
-        lambda row: row['revenue'] if row['financial_status'] in ['refunded', 'partially_refunded'] else 0.0,
-        axis=1
-    )
-    transformed['refund'] = transformed['refund_amount']  # Alias for dashboard compatibility
+    is_refund = cols['financial_status'].isin(['refunded', 'partially_refunded']).to_numpy()
+    cols['refund_amount'] = np.where(is_refund, cols['revenue'], 0.0)
 
-    # Add channel identifier
-    transformed['channel'] = channel
+    # Add channel identifier and dictionary-encode low-cardinality columns
+    _categorize(cols, channel)
 
     # Calculate derived metrics (needed by dashboard)
-    # Net revenue = revenue - refunds
-    transformed['net_revenue'] = transformed['revenue'] - transformed['refund_amount']
+    _add_profit_columns(cols)
 
-    # Gross profit = net_revenue - COGS
-    transformed['gross_profit'] = transformed['net_revenue'] - transformed['cogs']
-
-    # Net profit = gross_profit - shipping - platform fees - tax
-    transformed['net_profit'] = transformed['gross_profit'] - transformed['shipping_cost'] - transformed['platform_fee']
-
-    # Remove rows with invalid dates or revenue
-    transformed = transformed.dropna(subset=['date', 'revenue'])
-
-    # Remove rows where revenue is 0 or negative
-    transformed = transformed[transformed['revenue'] > 0]
-
-    if transformed.empty:
-        st.warning(f"⚠️ No valid data rows found for {channel}. Check that created_at has dates and line_total has numbers.")
-        return None
-
-    return transformed
+    return _to_dashboard_frame(cols)
 
 
 def transform_amazon_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -308,60 +633,54 @@ def transform_amazon_data(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty:
         return None
 
-    # Create transformed DataFrame
-    transformed = pd.DataFrame()
-
     # Map date column - Amazon uses 'purchase-date'
-    transformed['date'] = pd.to_datetime(df['purchase-date'], errors='coerce')
-
-    # Map order_id - Amazon uses 'amazon-order-id'
-    transformed['order_id'] = df['amazon-order-id'].astype(str).str.strip()
+    date = pd.to_datetime(df['purchase-date'], errors='coerce')
 
     # Map revenue - use item-price (convert from currency format if needed)
     if 'item-price' in df.columns:
         # Handle currency format (e.g., "$123.45")
-        item_price = df['item-price'].astype(str).str.replace('$', '').str.replace(',', '').str.strip()
-        transformed['revenue'] = pd.to_numeric(item_price, errors='coerce')
+        revenue = _to_money(df['item-price'])
     else:
-        transformed['revenue'] = 0
+        revenue = pd.Series(0.0, index=df.index)
+
+    # Drop rows with invalid dates or zero/negative revenue before deriving
+    # the remaining columns, so no work is spent on rows that get discarded
+    valid = date.notna() & (revenue > 0)
+    if not valid.any():
+        st.warning(f"⚠️ No valid data rows found for Amazon. Check that purchase-date has dates and item-price has numbers.")
+        return None
+    df = df.loc[valid]
+
+    # Collect output columns, then build the DataFrame in one allocation
+    cols = {'date': date[valid]}
+
+    # Map order_id - Amazon uses 'amazon-order-id'
+    cols['order_id'] = _strip(df['amazon-order-id'])
+
+    cols['revenue'] = revenue[valid]
 
     # Map shipping cost - use shipping_label_cost from Amazon_Fees table
     if 'shipping_label_cost' in df.columns:
-        shipping_label = df['shipping_label_cost'].astype(str).str.replace('$', '').str.replace(',', '').str.strip()
-        transformed['shipping_cost'] = pd.to_numeric(shipping_label, errors='coerce').fillna(0)
+        cols['shipping_cost'] = _to_money(df['shipping_label_cost'])
     elif 'shipping-price' in df.columns:
-        shipping_price = df['shipping-price'].astype(str).str.replace('$', '').str.replace(',', '').str.strip()
-        transformed['shipping_cost'] = pd.to_numeric(shipping_price, errors='coerce').fillna(0)
+        cols['shipping_cost'] = _to_money(df['shipping-price'])
     else:
-        transformed['shipping_cost'] = 0
+        cols['shipping_cost'] = 0
 
     # Map tax - combine item-tax and shipping-tax
     item_tax = 0
     shipping_tax = 0
 
     if 'item-tax' in df.columns:
-        item_tax_clean = df['item-tax'].astype(str).str.replace('$', '').str.replace(',', '').str.strip()
-        item_tax = pd.to_numeric(item_tax_clean, errors='coerce').fillna(0)
+        item_tax = _to_money(df['item-tax'])
 
     if 'shipping-tax' in df.columns:
-        shipping_tax_clean = df['shipping-tax'].astype(str).str.replace('$', '').str.replace(',', '').str.strip()
-        shipping_tax = pd.to_numeric(shipping_tax_clean, errors='coerce').fillna(0)
-
-    transformed['tax'] = item_tax + shipping_tax
+        shipping_tax = _to_money(df['shipping-tax'])
 
-    # Map state column - Amazon uses 'ship-state'
-    if 'ship-state' in df.columns:
-        transformed['state'] = df['ship-state'].astype(str).str.strip().str.upper()
-        # Handle null/empty states
-        transformed['state'] = transformed['state'].replace(['', 'NAN', 'NONE'], 'Unknown')
-    else:
-        transformed['state'] = 'Unknown'
+    cols['tax'] = item_tax + shipping_tax
 
-    # Products column - use product-name
-    if 'product-name' in df.columns:
-        transformed['products'] = df['product-name'].astype(str).str.strip()
-    else:
-        transformed['products'] = 'Amazon Product'
+    # State and product columns
+    _map_text_columns(df, AMAZON_PRODUCT_COLUMNS, cols)
 
     # Financial status - map from order-status
     if 'order-status' in df.columns:
@@ -373,98 +692,68 @@ def transform_amazon_data(df: pd.DataFrame) -> pd.DataFrame:
             'Delivered': 'paid',
             'Unshipped': 'pending'
         }
-        transformed['financial_status'] = df['order-status'].astype(str).str.strip().map(status_map).fillna('paid')
-        # Keep original order-status for unfulfilled tracking
-        transformed['order_status'] = df['order-status'].astype(str).str.strip()
-    else:
-        transformed['financial_status'] = 'paid'
-        transformed['order_status'] = 'Shipped'
-
-    # Customer name (Amazon uses recipient-name)
-    if 'recipient-name' in df.columns:
-        transformed['customer_name'] = df['recipient-name'].astype(str).str.strip()
-    else:
-        transformed['customer_name'] = 'N/A'
-
-    # Shipping address fields (Amazon uses ship-address, ship-city, ship-postal-code)
-    if 'ship-address' in df.columns:
-        transformed['shipping_address'] = df['ship-address'].astype(str).str.strip()
-    else:
-        transformed['shipping_address'] = 'N/A'
-
-    if 'ship-city' in df.columns:
-        transformed['shipping_city'] = df['ship-city'].astype(str).str.strip()
+        order_status = _strip(df['order-status'])
+        # Map the handful of distinct statuses, then broadcast through the codes
+        # (code -1 is a missing status, which picks the trailing 'paid')
+        raw = order_status.astype('category')
+        mapped = [status_map.get(c, 'paid') for c in raw.cat.categories] + ['paid']
+        categories, lookup = np.unique(mapped, return_inverse=True)
+        cols['financial_status'] = pd.Series(
+            pd.Categorical.from_codes(lookup[raw.cat.codes.to_numpy()], categories=categories),
+            index=df.index
+        )
+        # Keep original order-status for unfulfilled tracking (already encoded above)
+        cols['order_status'] = raw
     else:
-        transformed['shipping_city'] = 'N/A'
+        cols['financial_status'] = _const_str(df, 'paid')
+        cols['order_status'] = _const_str(df, 'Shipped')
 
-    if 'ship-postal-code' in df.columns:
-        transformed['shipping_zipcode'] = df['ship-postal-code'].astype(str).str.strip()
-    else:
-        transformed['shipping_zipcode'] = 'N/A'
+    # Customer and shipping fields (Amazon uses recipient-name, ship-address, ...)
+    _map_text_columns(df, AMAZON_CONTACT_COLUMNS, cols)
 
     # Calculate COGS (Cost of Goods Sold)
     # Estimate: 40% of revenue (adjust as needed)
-    transformed['cogs'] = transformed['revenue'] * 0.40
+    cols['cogs'] = cols['revenue'] * 0.40
 
     # Amazon platform fees - use referral_fee from Amazon_Fees table
     if 'referral_fee' in df.columns:
-        transformed['platform_fee'] = pd.to_numeric(df['referral_fee'], errors='coerce').fillna(0)
+        cols['platform_fee'] = _num(df, 'referral_fee')
     else:
         # Fallback: calculate as 15% referral fee + $0.99 per item
-        transformed['platform_fee'] = (transformed['revenue'] * 0.15) + 0.99
+        cols['platform_fee'] = (cols['revenue'] * 0.15) + 0.99
 
     # Apply discounts if available
     total_discount = 0
     if 'item-promotion-discount' in df.columns:
-        discount_clean = df['item-promotion-discount'].astype(str).str.replace('$', '').str.replace(',', '').str.strip()
-        total_discount += pd.to_numeric(discount_clean, errors='coerce').fillna(0)
+        total_discount += _to_money(df['item-promotion-discount'])
 
     if 'ship-promotion-discount' in df.columns:
-        ship_discount = df['ship-promotion-discount'].astype(str).str.replace('$', '').str.replace(',', '').str.strip()
-        total_discount += pd.to_numeric(ship_discount, errors='coerce').fillna(0)
+        total_discount += _to_money(df['ship-promotion-discount'])
 
     # Add discount field
-    transformed['discount'] = total_discount
+    cols['discount'] = total_discount
 
     # Calculate refund amount based on financial_status
-    transformed['refund_amount'] = transformed.apply(
-        lambda row: row['revenue'] if row['financial_status'] == 'refunded' else 0.0,
-        axis=1
-    )
-    transformed['refund'] = transformed['refund_amount']
-
-    # Add channel identifier
-    transformed['channel'] = 'Amazon'
-
-    # Calculate derived metrics
-    # Net revenue = revenue - refunds - discounts
-    transformed['net_revenue'] = transformed['revenue'] - transformed['refund_amount'] - total_discount
+    is_refund = cols['financial_status'].eq('refunded').to_numpy()
+    cols['refund_amount'] = np.where(is_refund, cols['revenue'].to_numpy(), 0.0)
 
-    # Gross profit = net_revenue - COGS
-    transformed['gross_profit'] = transformed['net_revenue'] - transformed['cogs']
+    # Add channel identifier and dictionary-encode low-cardinality columns
+    _categorize(cols, 'Amazon')
 
-    # Net profit = gross_profit - shipping - platform fees
-    transformed['net_profit'] = transformed['gross_profit'] - transformed['shipping_cost'] - transformed['platform_fee']
+    # Calculate derived metrics (discounts also reduce net revenue)
+    _add_profit_columns(cols, discount=total_discount)
 
-    # Remove rows with invalid dates or revenue
-    transformed = transformed.dropna(subset=['date', 'revenue'])
+    return _to_dashboard_frame(cols)
 
-    # Remove rows where revenue is 0 or negative
-    transformed = transformed[transformed['revenue'] > 0]
 
-    if transformed.empty:
-        st.warning(f"⚠️ No valid data rows found for Amazon. Check that purchase-date has dates and item-price has numbers.")
-        return None
-
-    return transformed
-
-
-def fetch_fee_data(table_name: str) -> pd.DataFrame:
+def fetch_fee_data(table_name: str, columns: str = '*', filters: list = ()) -> pd.DataFrame:
     """
     Fetch fee data from Supabase fee tables.
 
     Args:
         table_name: Name of the fee table (Shopify_Fees, Walmart_Fees, Amazon_Fees)
+        columns: Select clause
+        filters: (column, operator, criteria) tuples applied server-side
 
     Returns:
         DataFrame containing fee data or None if error
@@ -475,35 +764,127 @@ def fetch_fee_data(table_name: str) -> pd.DataFrame:
         if client is None:
             return None
 
-        # Fetch all rows using pagination
-        all_data = []
-        batch_size = 1000
-        offset = 0
+        # Fetch all rows (pages are requested in parallel when the table has PAGE_KEY)
+        key = _page_key(get_table_columns(client, table_name))
+        return _paginated_fetch(client, table_name, columns, filters, key=key)
 
-        while True:
-            response = client.table(table_name).select('*').range(offset, offset + batch_size - 1).execute()
+    except Exception as e:
+        st.warning(f"⚠️ Could not fetch {table_name}: {str(e)}")
+        return None
 
-            if not response.data:
-                break
 
-            all_data.extend(response.data)
+# Tables found to have no updated_at column; their fetches skip the probe
+_NO_UPDATED_AT: set = set()
 
-            if len(response.data) < batch_size:
-                break
 
-            offset += batch_size
-
-        if not all_data:
-            return None
+def _freshness_token(client: Client, tables: tuple) -> Optional[list]:
+    """
+    Probe the tables for a cheap "has anything changed" token.
 
-        return pd.DataFrame(all_data)
+    One request per table returns the exact row count and the newest
+    updated_at, which together change on any insert, delete or update.
+    A table without updated_at is remembered, so later calls return None
+    without sending any probe.
 
-    except Exception as e:
-        st.warning(f"⚠️ Could not fetch {table_name}: {str(e)}")
+    Returns:
+        [[count, max_updated_at], ...] per table, or None if a table has no
+        updated_at column (changes could not be detected reliably)
+    """
+    if _NO_UPDATED_AT.intersection(tables):
         return None
 
+    token = []
+    for table_name in tables:
+        try:
+            response = (
+                client.table(table_name)
+                .select('updated_at', count='exact')
+                .order('updated_at', desc=True)
+                .limit(1)
+                .execute()
+            )
+        except Exception as e:
+            # 42703: undefined column
+            if getattr(e, 'code', None) == '42703':
+                logger.warning("%s has no updated_at column; disk cache disabled for it", table_name)
+                _NO_UPDATED_AT.add(table_name)
+                return None
+            raise
+        latest = response.data[0]['updated_at'] if response.data else None
+        token.append([response.count, latest])
+    return token
+
+
+def _disk_cached(name: str, *tables: str) -> Callable:
+    """
+    Keep a fetch function's transformed result in a local Parquet file.
+
+    Sits under the fetchers' 5-minute st.cache_resource, and only runs when
+    CACHE_CONFIG['disk_cache_enabled'] is set (off by default: the files
+    hold customer names and addresses unencrypted). Before fetching, the
+    source tables are probed with _freshness_token. If the token matches the
+    one saved next to the Parquet file, the file is loaded instead of
+    re-fetching and re-transforming every row; otherwise the fetch runs and
+    both files are rewritten. Any probe or cache I/O failure is logged and
+    falls through to a normal fetch.
+
+    Args:
+        name: Cache file stem (e.g. 'shopify')
+        tables: Tables whose changes invalidate the cache
+
+    Returns:
+        Decorator for a zero-argument fetch function
+    """
+    def decorator(fetch: Callable[[], Optional[pd.DataFrame]]) -> Callable[[], Optional[pd.DataFrame]]:
+        @wraps(fetch)
+        def wrapper() -> Optional[pd.DataFrame]:
+            cache_config = get_config().cache
+            if not cache_config['disk_cache_enabled']:
+                return fetch()
+
+            cache_dir = cache_config['disk_cache_dir']
+            data_path = os.path.join(cache_dir, f'{name}_v1.parquet')
+            token_path = os.path.join(cache_dir, f'{name}_v1.json')
+
+            client = get_supabase_client()
+            if client is None:
+                return fetch()
+
+            try:
+                token = _freshness_token(client, tables)
+            except Exception as e:
+                logger.warning("Freshness probe for %s failed, fetching without the disk cache: %s", name, e)
+                token = None
+
+            if token is not None and os.path.exists(data_path):
+                try:
+                    with open(token_path) as f:
+                        if json.load(f)['token'] == token:
+                            return _apply_dashboard_schema(pd.read_parquet(data_path))
+                except Exception as e:
+                    logger.warning("Could not read disk cache %s, re-fetching: %s", data_path, e)
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+            df = fetch()
+
+            if token is not None and df is not None:
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    df.to_parquet(data_path + '.tmp', compression='zstd', index=False)
+                    os.replace(data_path + '.tmp', data_path)
+                    with open(token_path, 'w') as f:
+                        json.dump({'token': token}, f)
+                except Exception as e:
+                    logger.warning("Could not write disk cache %s: %s", data_path, e)
+
+            return df
+
+        return wrapper
+
+    return decorator
+
+
+@st.cache_resource(ttl=300)  # Cache for 5 minutes; shared read-only, not copied per hit
+@_disk_cached('shopify', SHOPIFY_TABLE, SHOPIFY_FEES_TABLE)
 def fetch_shopify_data() -> pd.DataFrame:
     """
     Fetch Shopify data from Supabase.
@@ -517,35 +898,33 @@ def fetch_shopify_data() -> pd.DataFrame:
         if client is None:
             return None
 
-        # Fetch all rows using pagination (Supabase has 1000 row default limit per request)
-        all_data = []
-        batch_size = 1000
-        offset = 0
-
-        while True:
-            response = client.table(SHOPIFY_TABLE).select('*').range(offset, offset + batch_size - 1).execute()
+        # Only fetch the columns the transform reads
+        table_columns = get_table_columns(client, SHOPIFY_TABLE)
+        columns = get_available_columns(table_columns, 'Shopify')
 
-            if not response.data:
-                break
+        if not columns:
+            st.info(f"ℹ️ No data found in {SHOPIFY_TABLE} table. Using sample data.")
+            return None
 
-            all_data.extend(response.data)
+        revenue_col = 'order_total_price' if 'order_total_price' in columns else 'line_total'
 
-            # If we got less than batch_size rows, we've reached the end
-            if len(response.data) < batch_size:
-                break
+        # Fee table is independent of the order rows - fetch it concurrently
+        fees_future = _fetch_in_background(fetch_fee_data, SHOPIFY_FEES_TABLE)
 
-            offset += batch_size
+        # Fetch all rows (pages are requested in parallel when the table has PAGE_KEY)
+        # Rows without a date or with non-positive revenue are dropped server-side
+        df_raw = _paginated_fetch(
+            client, SHOPIFY_TABLE, build_select_clause(columns), key=_page_key(table_columns),
+            filters=[('created_at', 'not.is', 'null'), (revenue_col, 'gt', 0)]
+        )
 
         # Check if we got any data
-        if not all_data:
+        if df_raw is None:
             st.info(f"ℹ️ No data found in {SHOPIFY_TABLE} table. Using sample data.")
             return None
 
-        # Convert to DataFrame
-        df_raw = pd.DataFrame(all_data)
-
-        # Fetch fee data
-        df_fees = fetch_fee_data(SHOPIFY_FEES_TABLE)
+        # Collect fee data fetched in the background
+        df_fees = fees_future.result()
 
         # Merge fee data with order data if available
         if df_fees is not None and not df_fees.empty:
@@ -567,14 +946,11 @@ def fetch_shopify_data() -> pd.DataFrame:
                     df_fees['processing_fee'] = pd.to_numeric(df_fees['processing_fee'], errors='coerce').fillna(0).abs()
                     agg_dict['processing_fee'] = 'sum'
 
+                # Join on the aggregated fees' order_id index (one row per order);
+                # without fee columns there is nothing to add
                 if agg_dict:
-                    df_fees_agg = df_fees.groupby(merge_key).agg(agg_dict).reset_index()
-                else:
-                    # If no fee columns found, just get unique order IDs
-                    df_fees_agg = df_fees[[merge_key]].drop_duplicates()
-
-                # Merge with order data using order_id
-                df_raw = df_raw.merge(df_fees_agg, on=merge_key, how='left', suffixes=('', '_fee'))
+                    df_fees_agg = df_fees.groupby(merge_key).agg(agg_dict)
+                    df_raw = df_raw.join(df_fees_agg, on=merge_key, how='left', rsuffix='_fee')
 
         # Transform the data to dashboard format
         df = transform_shopify_walmart_data(df_raw, 'Shopify')
@@ -586,7 +962,8 @@ def fetch_shopify_data() -> pd.DataFrame:
         return None
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@st.cache_resource(ttl=300)  # Cache for 5 minutes; shared read-only, not copied per hit
+@_disk_cached('walmart', WALMART_TABLE, WALMART_FEES_TABLE)
 def fetch_walmart_data() -> pd.DataFrame:
     """
     Fetch Walmart data from Supabase.
@@ -600,72 +977,57 @@ def fetch_walmart_data() -> pd.DataFrame:
         if client is None:
             return None
 
-        # Fetch all rows using pagination (Supabase has 1000 row default limit per request)
-        all_data = []
-        batch_size = 1000
-        offset = 0
+        # Only fetch the columns the transform reads
+        table_columns = get_table_columns(client, WALMART_TABLE)
+        columns = get_available_columns(table_columns, 'Walmart')
 
-        while True:
-            response = client.table(WALMART_TABLE).select('*').range(offset, offset + batch_size - 1).execute()
-
-            if not response.data:
-                break
+        if not columns:
+            st.info(f"ℹ️ No data found in {WALMART_TABLE} table. Using sample data.")
+            return None
 
-            all_data.extend(response.data)
 
-            # If we got less than batch_size rows, we've reached the end
-            if len(response.data) < batch_size:
-                break
+        # Fee table is independent of the order rows - fetch it concurrently.
+        # The SALE/ADJMNT split is done server-side, one query per transaction type:
+        # - commission_from_sale where transaction_type = 'SALE' for platform fees
+        # - commission_from_sale where transaction_type = 'ADJMNT' for shipping costs
+        # (ilike without wildcards is a case-insensitive equality match)
+        fee_futures = {
+            fee_col: _fetch_in_background(
+                fetch_fee_data, WALMART_FEES_TABLE, 'walmart_po,commission_from_sale',
+                [('transaction_type', 'ilike', transaction_type)]
+            )
+            for fee_col, transaction_type in (('processing_fee', 'SALE'), ('walmart_shipping', 'ADJMNT'))
+        }
 
-            offset += batch_size
+        # Fetch all rows (pages are requested in parallel when the table has PAGE_KEY)
+        # Rows without a date or with non-positive revenue are dropped server-side
+        df_raw = _paginated_fetch(
+            client, WALMART_TABLE, build_select_clause(columns), key=_page_key(table_columns),
+            filters=[('created_at', 'not.is', 'null'), ('line_total', 'gt', 0)]
+        )
 
         # Check if we got any data
-        if not all_data:
+        if df_raw is None:
             st.info(f"ℹ️ No data found in {WALMART_TABLE} table. Using sample data.")
             return None
 
-        # Convert to DataFrame
-        df_raw = pd.DataFrame(all_data)
+        # Collect fee data fetched in the background and sum it per walmart_po
+        fee_totals = {}
+        for fee_col, future in fee_futures.items():
+            df_fees = future.result()
+            if df_fees is not None and not df_fees.empty:
+                fee_totals[fee_col] = df_fees.groupby('walmart_po')['commission_from_sale'].sum()
 
-        # Fetch fee data
-        df_fees = fetch_fee_data(WALMART_FEES_TABLE)
+        # Walmart_Fees uses walmart_po column to join with Walmart_OrderData's order_id
+        if fee_totals:
+            # One row per walmart_po, one column per fee type
+            fees_wide = pd.DataFrame(fee_totals)
 
-        # Merge fee data with order data if available
-        if df_fees is not None and not df_fees.empty:
-            # Walmart_Fees uses walmart_po column to join with Walmart_OrderData's order_id
-            if 'walmart_po' in df_fees.columns:
-                # Aggregate fee data by walmart_po and transaction_type
-                # For Walmart we need:
-                # - commission_from_sale where transaction_type = 'SALE' for platform fees
-                # - commission_from_sale where transaction_type = 'ADJMNT' for shipping costs
-
-                # Create separate columns for each transaction type
-                fee_pivot = df_fees.copy()
-
-                # Get platform fee (SALE transactions)
-                platform_fees = fee_pivot[fee_pivot['transaction_type'].astype(str).str.upper() == 'SALE'].copy()
-                if not platform_fees.empty:
-                    platform_fees = platform_fees.groupby('walmart_po')['commission_from_sale'].sum().reset_index()
-                    platform_fees.rename(columns={'walmart_po': 'order_id', 'commission_from_sale': 'processing_fee'}, inplace=True)
-
-                # Get shipping costs (ADJMNT transactions)
-                shipping_fees = fee_pivot[fee_pivot['transaction_type'].astype(str).str.upper() == 'ADJMNT'].copy()
-                if not shipping_fees.empty:
-                    shipping_fees = shipping_fees.groupby('walmart_po')['commission_from_sale'].sum().reset_index()
-                    shipping_fees.rename(columns={'walmart_po': 'order_id', 'commission_from_sale': 'walmart_shipping'}, inplace=True)
-
-                # Ensure both DataFrames have order_id as string for merge
-                df_raw['order_id'] = df_raw['order_id'].astype(str)
-
-                # Merge platform fees
-                if not platform_fees.empty:
-                    platform_fees['order_id'] = platform_fees['order_id'].astype(str)
-                    df_raw = df_raw.merge(platform_fees, on='order_id', how='left')
-
-                # Merge shipping fees
-                if not shipping_fees.empty:
-                    shipping_fees['order_id'] = shipping_fees['order_id'].astype(str)
-                    df_raw = df_raw.merge(shipping_fees, on='order_id', how='left')
+            # Ensure both sides use string order ids for the join
+            fees_wide.index = fees_wide.index.astype(str)
+            df_raw['order_id'] = df_raw['order_id'].astype(str)
+
+            df_raw = df_raw.join(fees_wide, on='order_id', how='left')
 
         # Transform the data to dashboard format
         df = transform_shopify_walmart_data(df_raw, 'Walmart')
@@ -677,7 +1039,8 @@ def fetch_walmart_data() -> pd.DataFrame:
         return None
 
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+@st.cache_resource(ttl=300)  # Cache for 5 minutes; shared read-only, not copied per hit
+@_disk_cached('amazon', AMAZON_TABLE, AMAZON_FEES_TABLE)
 def fetch_amazon_data() -> pd.DataFrame:
     """
     Fetch Amazon data from Supabase.
@@ -691,35 +1054,33 @@ def fetch_amazon_data() -> pd.DataFrame:
         if client is None:
             return None
 
-        # Fetch all rows using pagination (Supabase has 1000 row default limit per request)
-        all_data = []
-        batch_size = 1000
-        offset = 0
+        # Only fetch the columns the transform reads
+        table_columns = get_table_columns(client, AMAZON_TABLE)
+        columns = get_available_columns(table_columns, 'Amazon')
 
-        while True:
-            response = client.table(AMAZON_TABLE).select('*').range(offset, offset + batch_size - 1).execute()
-
-            if not response.data:
-                break
+        if not columns:
+            st.info(f"ℹ️ No data found in {AMAZON_TABLE} table. Using sample data.")
+            return None
 
-            all_data.extend(response.data)
 
-            # If we got less than batch_size rows, we've reached the end
-            if len(response.data) < batch_size:
-                break
+        # Fee table is independent of the order rows - fetch it concurrently
+        fees_future = _fetch_in_background(fetch_fee_data, AMAZON_FEES_TABLE)
 
-            offset += batch_size
+        # Fetch all rows (pages are requested in parallel when the table has PAGE_KEY)
+        # Rows without a date are dropped server-side (item-price is a currency
+        # string, so the revenue check stays in the transform)
+        df_raw = _paginated_fetch(
+            client, AMAZON_TABLE, build_select_clause(columns), key=_page_key(table_columns),
+            filters=[('"purchase-date"', 'not.is', 'null')]
+        )
 
         # Check if we got any data
-        if not all_data:
+        if df_raw is None:
             st.info(f"ℹ️ No data found in {AMAZON_TABLE} table. Using sample data.")
             return None
 
-        # Convert to DataFrame
-        df_raw = pd.DataFrame(all_data)
-
-        # Fetch fee data
-        df_fees = fetch_fee_data(AMAZON_FEES_TABLE)
+        # Collect fee data fetched in the background
+        df_fees = fees_future.result()
 
         # Merge fee data with order data if available
         if df_fees is not None and not df_fees.empty:
@@ -743,15 +1104,15 @@ def fetch_amazon_data() -> pd.DataFrame:
                     agg_dict['shipping_label_cost'] = 'sum'
 
                 if agg_dict:
-                    # Aggregate fees per order
-                    df_fees_agg = df_fees.groupby('order_id').agg(agg_dict).reset_index()
+                    # Aggregate fees per order (one row per order_id index entry)
+                    df_fees_agg = df_fees.groupby('order_id').agg(agg_dict)
 
-                    # Ensure both columns are strings for merge
+                    # Ensure both sides are strings for the join
                     df_raw['amazon-order-id'] = df_raw['amazon-order-id'].astype(str)
-                    df_fees_agg['order_id'] = df_fees_agg['order_id'].astype(str)
+                    df_fees_agg.index = df_fees_agg.index.astype(str)
 
-                    # Merge using amazon-order-id from OrderData and order_id from Fees
-                    df_raw = df_raw.merge(df_fees_agg, left_on='amazon-order-id', right_on='order_id', how='left', suffixes=('', '_fee'))
+                    # Join amazon-order-id from OrderData against the Fees order_id index
+                    df_raw = df_raw.join(df_fees_agg, on='amazon-order-id', how='left', rsuffix='_fee')
 
         # Transform the data to dashboard format
         df = transform_amazon_data(df_raw)
@@ -768,33 +1129,47 @@ def fetch_all_order_data() -> pd.DataFrame:
     Fetch and combine data from Shopify, Walmart, and Amazon.
 
     Returns:
-        Combined DataFrame with all order data
+        Combined DataFrame with all order data, sorted by date
     """
     dataframes = []
 
-    # Fetch Shopify data
-    df_shopify = fetch_shopify_data()
-    if df_shopify is not None and not df_shopify.empty:
-        dataframes.append(df_shopify)
+    # Fetch Shopify, Walmart and Amazon data concurrently (network-bound)
+    with _thread_pool(max_workers=3) as executor:
+        futures = [
+            executor.submit(fetch_channel)
+            for fetch_channel in (fetch_shopify_data, fetch_walmart_data, fetch_amazon_data)
+        ]
 
-    # Fetch Walmart data
-    df_walmart = fetch_walmart_data()
-    if df_walmart is not None and not df_walmart.empty:
-        dataframes.append(df_walmart)
-
-    # Fetch Amazon data
-    df_amazon = fetch_amazon_data()
-    if df_amazon is not None and not df_amazon.empty:
-        dataframes.append(df_amazon)
+        # Collect in submission order so the combined frame is stable
+        for future in futures:
+            df_channel = future.result()
+            if df_channel is not None and not df_channel.empty:
+                dataframes.append(df_channel)
 
     # Combine dataframes
     if dataframes:
-        df_combined = pd.concat(dataframes, ignore_index=True)
-        return df_combined
+        # Every frame shares DASHBOARD_SCHEMA, so blocks concatenate without upcasting
+        df_combined = pd.concat(dataframes, ignore_index=True, copy=False)
+
+        # Categories differ per channel, so concat widens these to object;
+        # re-encode them over the combined values
+        for col in CATEGORY_COLUMNS:
+            if col in df_combined.columns:
+                df_combined[col] = df_combined[col].astype('category')
+
+        # Date order lets the dashboard slice date windows by binary search;
+        # stable, so each channel's rows keep their fetch order within a date
+        return df_combined.sort_values('date', kind='stable', ignore_index=True)
     else:
         return None
 
 
+def clear_order_data_cache() -> None:
+    """Drop the cached channel frames so the next fetch goes back to Supabase."""
+    for fetch_channel in (fetch_shopify_data, fetch_walmart_data, fetch_amazon_data):
+        fetch_channel.clear()
+
+
 def insert_order(order_data: dict) -> bool:
     """
     Insert a new order into Supabase.
@@ -850,6 +1225,55 @@ def get_data_summary(df: pd.DataFrame) -> dict:
     }
 
 
+# Bulk uploads keep this many insert requests in flight
+UPLOAD_WORKERS = 8
+UPLOAD_ATTEMPTS = 3
+
+
+# Transport errors raised before the request reached the server. Timeouts
+# and protocol errors mid-request are excluded: the insert may already have
+# been committed, and sending it again would duplicate the batch.
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed request is safe to retry (never sent, or HTTP 5xx)."""
+    if isinstance(error, _UNSENT_ERRORS):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    # postgrest's APIError carries the HTTP status as its code when the
+    # response body was not JSON (e.g. a gateway error page)
+    code = getattr(error, 'code', None)
+    return isinstance(code, int) and code >= 500
+
+
+def _insert_batch(client: Client, batch: list) -> bool:
+    """
+    Insert one batch of order rows, retrying with exponential backoff.
+
+    Only connection failures and 5xx responses are retried. Any response that
+    does not raise means the rows were written (an empty body just means
+    nothing was returned), so the batch is never sent twice after success.
+
+    Returns:
+        True once the batch was inserted
+
+    Raises:
+        Exception: The request error if it is not transient, or the last
+            one if every attempt failed
+    """
+    for attempt in range(UPLOAD_ATTEMPTS):
+        if attempt:
+            time.sleep(0.5 * 2 ** (attempt - 1))
+        try:
+            client.table('orders').insert(batch).execute()
+            return True
+        except Exception as e:
+            if attempt == UPLOAD_ATTEMPTS - 1 or not _is_transient(e):
+                raise
+
+
 # Optional: Bulk upload function for migrating from Google Sheets
 def bulk_upload_from_dataframe(df: pd.DataFrame, batch_size: int = 100) -> bool:
     """
@@ -870,23 +1294,38 @@ def bulk_upload_from_dataframe(df: pd.DataFrame, batch_size: int = 100) -> bool:
             st.error("❌ Cannot upload: Supabase client not initialized")
             return False
 
-        # Convert DataFrame to list of dictionaries
-        records = df.to_dict('records')
-
-        # Upload in batches
-        total_batches = (len(records) + batch_size - 1) // batch_size
-
-        for i in range(0, len(records), batch_size):
-            batch = records[i:i + batch_size]
-            batch_num = i // batch_size + 1
-
-            response = client.table('orders').insert(batch).execute()
-
-            if not response.data:
-                st.error(f"❌ Failed to upload batch {batch_num}/{total_batches}")
-                return False
-
-            st.info(f"✅ Uploaded batch {batch_num}/{total_batches}")
+        # Convert DataFrame to list of dictionaries (Arrow builds the dicts in C;
+        # missing values become None)
+        records = pa.Table.from_pandas(df, preserve_index=False).to_pylist()
+
+        # Upload in batches, several in flight at once
+        batches = [records[i:i + batch_size] for i in range(0, len(records), batch_size)]
+        total_batches = len(batches)
+        failed = {}  # batch number -> error
+
+        if batches:
+            progress = st.progress(0.0, text=f"Uploading {total_batches} batches...")
+
+            with _thread_pool(max_workers=UPLOAD_WORKERS) as executor:
+                futures = {
+                    executor.submit(_insert_batch, client, batch): batch_num
+                    for batch_num, batch in enumerate(batches, start=1)
+                }
+
+                for done, future in enumerate(as_completed(futures), start=1):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failed[futures[future]] = e
+                    progress.progress(done / total_batches, text=f"Uploaded {done}/{total_batches} batches")
+
+        if failed:
+            first = min(failed)
+            st.error(
+                f"❌ Failed to upload batch(es) {', '.join(map(str, sorted(failed)))} of {total_batches}"
+                f" (batch {first}: {failed[first]})"
+            )
+            return False
 
         st.success(f"✅ Successfully uploaded {len(records)} records!")
         return True
@@ -6,53 +6,260 @@ from all three tables (Shopify, Walmart, Amazon).
 
 Usage:
     python test_supabase_connection.py
+    python test_supabase_connection.py --json   # results as one JSON object on stdout
 """
 
+import json
 import os
+import random
 import sys
-from dotenv import load_dotenv
-from supabase import create_client
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+# postgrest/httpx/dotenv are imported where they're needed, so a missing
+# credential fails in Step 1 without paying for those imports
+
+# Load environment variables - only parse .env when they aren't already exported
+if not (os.environ.get("SUPABASE_URL") and os.environ.get("SUPABASE_KEY")):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+
+# One keep-alive HTTP/2 session shared by every request in the test
+HTTP_MAX_CONNECTIONS = 4
+HTTP_TIMEOUT_SECONDS = 30.0
+HTTP_CONNECT_TIMEOUT_SECONDS = 5.0
+
+# Transient failures (pooler hiccups, rate limits) are retried with jittered backoff
+PROBE_ATTEMPTS = 3
+PROBE_BACKOFF_SECONDS = 0.2
+TRANSIENT_STATUS_CODES = frozenset({'429', '502', '503', '504'})
+
+# Columns fetched for the sample record - the order fields the dashboard relies on.
+# Hyphenated Amazon names must be quoted for PostgREST.
+PROBE_COLUMNS = {
+    'Shopify': 'order_id,created_at,line_total,state,product_name',
+    'Walmart': 'order_id,created_at,line_total,state,product_name',
+    'Amazon': '"amazon-order-id","purchase-date","item-price","ship-state","product-name"'
+}
+
+# Error text Postgres/Supavisor return when the database is out of connection slots
+CONNECTION_LIMIT_ERRORS = ('maxclientsinsessionmode', 'max client', 'too many connections',
+                           'remaining connection slots')
+
+
+# Fixed output fragments, built once
+SEPARATOR = "=" * 60
+ERR_FETCH = "❌ ERROR: Failed to fetch from "
+
+# --json: print the results as one JSON object; progress output moves to stderr
+JSON_MODE = "--json" in sys.argv[1:]
+
+# Output is queued per step and written with a single write() call
+_output = []
+
+
+def out(line=""):
+    """Queue a line of output for the next flush_output()."""
+    _output.append(f"{line}\n")
+
+
+def flush_output():
+    """Write all queued output to stdout (stderr in --json mode) in one call."""
+    stream = sys.stderr if JSON_MODE else sys.stdout
+    stream.write("".join(_output))
+    stream.flush()
+    _output.clear()
+
+
+def write_json(payload):
+    """Write payload to stdout as a single JSON document, using orjson when installed."""
+    try:
+        import orjson
+        text = orjson.dumps(payload, default=str).decode()
+    except ImportError:
+        text = json.dumps(payload, default=str)
+    sys.stdout.write(text + "\n")
+    sys.stdout.flush()
+
+
+def retry_request(request):
+    """
+    Run a Supabase request, retrying transient failures with jittered exponential backoff.
+
+    Requests passed in should disable postgrest's own retry (.retry(False)),
+    which only covers GET/HEAD 503/520 responses and sleeps without jitter.
+    """
+    import httpx
+    from postgrest.exceptions import APIError
+
+    for attempt in range(PROBE_ATTEMPTS):
+        try:
+            return request()
+        except (httpx.TransportError, APIError) as e:
+            transient = isinstance(e, httpx.TransportError) or str(e.code) in TRANSIENT_STATUS_CODES
+            if not transient or attempt == PROBE_ATTEMPTS - 1:
+                raise
+        time.sleep(PROBE_BACKOFF_SECONDS * 2 ** attempt + random.uniform(0, 0.1))
+
+
+def format_sample(sample):
+    """Format the first 5 fields of a sample record for the Step 6 printout."""
+    lines = []
+    for key in islice(sample, 5):
+        value = sample[key]
+        text = value if isinstance(value, str) else str(value)
+        lines.append(f"  {key}: {text[:50]}{'...' if len(text) > 50 else ''}")
+    return "\n".join(lines)
+
+
+def probe_table(client, table_name, columns='*'):
+    """Count a table's records and fetch one sample record; return a result dict."""
+    from postgrest.exceptions import APIError
+
+    try:
+        # HEAD request with count=exact - only the Content-Range header comes back
+        count = retry_request(
+            lambda: client.table(table_name).select('*', count='exact', head=True).retry(False).execute()
+        ).count or 0
+
+        if count == 0:
+            return {
+                'status': 'empty',
+                'count': 0,
+                'sample': None
+            }
+
+        # Only non-empty tables need a sample record
+        try:
+            response = retry_request(lambda: client.table(table_name).select(columns).limit(1).retry(False).execute())
+        except APIError as e:
+            if e.code != '42703':  # undefined_column
+                raise
+            # Schema differs from the expected columns - show whatever the table has
+            response = retry_request(lambda: client.table(table_name).select('*').limit(1).retry(False).execute())
+        sample = response.data[0] if response.data else None
+        return {
+            'status': 'success',
+            'count': count,
+            'sample': sample,
+            'sample_block': format_sample(sample) if sample else None
+        }
+
+    except Exception as e:
+        return {
+            'status': 'error',
+            'error': str(e)
+        }
+
+
+def probe_tables_rpc(client, tables):
+    """
+    Fetch sample records for every table in one round-trip.
+
+    Uses the probe_sample_tables() SQL function (see SUPABASE_SETUP.md), which
+    returns each channel's record count and one sample record. Returns None if
+    the function is missing or fails, so the caller can fall back to
+    per-table probes.
+    """
+    try:
+        response = retry_request(lambda: client.rpc('probe_sample_tables', {}).retry(False).execute())
+    except Exception:
+        return None
+
+    if not isinstance(response.data, dict):
+        return None
+
+    results = {}
+    for channel in tables:
+        probe = response.data.get(channel) or {}
+        if probe.get('count'):
+            sample = probe.get('sample')
+            results[channel] = {
+                'status': 'success',
+                'count': probe['count'],
+                'sample': sample,
+                'sample_block': format_sample(sample) if sample else None
+            }
+        else:
+            results[channel] = {
+                'status': 'empty',
+                'count': 0,
+                'sample': None
+            }
+    return results
 
-# Load environment variables
-load_dotenv()
 
 def test_connection():
     """Test Supabase connection and fetch sample data."""
 
-    print("=" * 60)
-    print("Supabase Connection Test")
-    print("=" * 60)
-    print()
+    out(SEPARATOR)
+    out("Supabase Connection Test")
+    out(SEPARATOR)
+    out()
 
     # Step 1: Check environment variables
-    print("Step 1: Checking environment variables...")
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
-
-    if not supabase_url:
-        print("❌ ERROR: SUPABASE_URL not found in environment variables")
-        print("   Make sure you have a .env file with SUPABASE_URL set")
-        sys.exit(1)
-
-    if not supabase_key:
-        print("❌ ERROR: SUPABASE_KEY not found in environment variables")
-        print("   Make sure you have a .env file with SUPABASE_KEY set")
+    out("Step 1: Checking environment variables...")
+    # Report every missing variable at once rather than one per run
+    missing = [name for name, value in (("SUPABASE_URL", SUPABASE_URL), ("SUPABASE_KEY", SUPABASE_KEY)) if not value]
+    if missing:
+        for name in missing:
+            out(f"❌ ERROR: {name} not found in environment variables")
+            out(f"   Make sure you have a .env file with {name} set")
+        flush_output()
         sys.exit(1)
 
-    print(f"✅ SUPABASE_URL: {supabase_url[:30]}...")
-    print(f"✅ SUPABASE_KEY: {supabase_key[:20]}...")
-    print()
+    out(f"✅ SUPABASE_URL: {SUPABASE_URL[:30]}...")
+    out(f"✅ SUPABASE_KEY: {SUPABASE_KEY[:20]}...")
+    out()
+    flush_output()
 
     # Step 2: Create Supabase client
-    print("Step 2: Creating Supabase client...")
+    out("Step 2: Creating Supabase client...")
+    import httpx
+    # Only the REST API is used, so talk to PostgREST directly instead of
+    # building the full supabase client (auth, storage, realtime, functions)
+    from postgrest import SyncPostgrestClient
+
+    http_client = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=HTTP_MAX_CONNECTIONS, max_connections=HTTP_MAX_CONNECTIONS),
+        timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS)
+    )
     try:
-        client = create_client(supabase_url, supabase_key)
-        print("✅ Supabase client created successfully")
-        print()
+        client = SyncPostgrestClient(
+            f"{SUPABASE_URL.rstrip('/')}/rest/v1",
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                "apikey": SUPABASE_KEY,
+                "Authorization": f"Bearer {SUPABASE_KEY}"
+            },
+            http_client=http_client
+        )
+        out("✅ Supabase client created successfully")
+        out(f"   HTTP/2 session: {HTTP_MAX_CONNECTIONS} connections, "
+            f"{HTTP_TIMEOUT_SECONDS:.0f}s timeout ({HTTP_CONNECT_TIMEOUT_SECONDS:.0f}s connect)")
+        out()
+        flush_output()
     except Exception as e:
-        print(f"❌ ERROR: Failed to create Supabase client: {str(e)}")
+        http_client.close()
+        out(f"❌ ERROR: Failed to create Supabase client: {e}")
+        flush_output()
         sys.exit(1)
 
+    try:
+        check_tables(client)
+    finally:
+        http_client.close()
+
+
+def check_tables(client):
+    """Probe the order tables and print the summary and recommendations."""
     # Step 3: Test table connections
     tables = {
         'Shopify': 'Shopify_OrderData',
@@ -60,130 +267,140 @@ def test_connection():
         'Amazon': 'Amazon_OrderData'
     }
 
-    results = {}
+    # Fetch all samples in a single RPC call when the helper function exists
+    results = probe_tables_rpc(client, tables)
 
-    for channel, table_name in tables.items():
-        print(f"Step 3.{list(tables.keys()).index(channel) + 1}: Testing {channel} table ({table_name})...")
-        try:
-            # Try to fetch first 5 records
-            response = client.table(table_name).select('*').limit(5).execute()
-
-            if response.data:
-                count = len(response.data)
-                print(f"✅ Successfully fetched {count} sample records from {table_name}")
-                results[channel] = {
-                    'status': 'success',
-                    'count': count,
-                    'sample': response.data[0] if response.data else None
-                }
-
-                # Show first record columns
-                if response.data:
-                    columns = list(response.data[0].keys())
-                    print(f"   Columns ({len(columns)}): {', '.join(columns[:8])}{'...' if len(columns) > 8 else ''}")
-            else:
-                print(f"⚠️  WARNING: Table {table_name} exists but has no data")
-                results[channel] = {
-                    'status': 'empty',
-                    'count': 0,
-                    'sample': None
-                }
-
-        except Exception as e:
-            print(f"❌ ERROR: Failed to fetch from {table_name}: {str(e)}")
-            results[channel] = {
-                'status': 'error',
-                'error': str(e)
+    if results is None:
+        # Otherwise probe all tables concurrently (one round-trip each);
+        # probe_table catches its own errors so one failure doesn't affect the others
+        with ThreadPoolExecutor(max_workers=len(tables)) as executor:
+            futures = {
+                channel: executor.submit(probe_table, client, table_name, PROBE_COLUMNS[channel])
+                for channel, table_name in tables.items()
             }
+            results = {channel: future.result() for channel, future in futures.items()}
 
-        print()
+    # Report in table order
+    for step, (channel, table_name) in enumerate(tables.items(), start=1):
+        out(f"Step 3.{step}: Testing {channel} table ({table_name})...")
+        result = results[channel]
+
+        if result['status'] == 'success':
+            out(f"✅ Found {result['count']} records in {table_name}")
+
+            # Show sample record columns
+            if result['sample']:
+                columns = list(result['sample'].keys())
+                out(f"   Columns ({len(columns)}): {', '.join(columns[:8])}{'...' if len(columns) > 8 else ''}")
+        elif result['status'] == 'empty':
+            out(f"⚠️  WARNING: Table {table_name} exists but has no data")
+        else:
+            out(ERR_FETCH + table_name + ": " + result['error'])
+
+        out()
+        # Per-table results are written as soon as each one is reported
+        flush_output()
 
     # Step 4: Summary
-    print("=" * 60)
-    print("Summary")
-    print("=" * 60)
-    print()
+    out(SEPARATOR)
+    out("Summary")
+    out(SEPARATOR)
+    out()
 
-    success_count = sum(1 for r in results.values() if r['status'] == 'success')
-    empty_count = sum(1 for r in results.values() if r['status'] == 'empty')
-    error_count = sum(1 for r in results.values() if r['status'] == 'error')
+    status_counts = Counter(r['status'] for r in results.values())
+    success_count = status_counts['success']
+    empty_count = status_counts['empty']
+    error_count = status_counts['error']
 
-    print(f"Tables tested: {len(tables)}")
-    print(f"✅ Successful connections: {success_count}")
-    print(f"⚠️  Empty tables: {empty_count}")
-    print(f"❌ Errors: {error_count}")
-    print()
+    out(f"Tables tested: {len(tables)}")
+    out(f"✅ Successful connections: {success_count}")
+    out(f"⚠️  Empty tables: {empty_count}")
+    out(f"❌ Errors: {error_count}")
+    out()
 
     # Detailed results
     for channel, result in results.items():
         if result['status'] == 'success':
-            print(f"✅ {channel}: {result['count']} records available")
+            out(f"✅ {channel}: {result['count']} records available")
         elif result['status'] == 'empty':
-            print(f"⚠️  {channel}: Table exists but is empty")
+            out(f"⚠️  {channel}: Table exists but is empty")
         else:
-            print(f"❌ {channel}: {result.get('error', 'Unknown error')}")
+            out(f"❌ {channel}: {result.get('error', 'Unknown error')}")
 
-    print()
+    out()
+    flush_output()
 
     # Step 5: Recommendations
     if success_count == len(tables):
-        print("🎉 All tables connected successfully!")
-        print()
-        print("Next steps:")
-        print("1. Run the dashboard: streamlit run zeofill_dashboard.py")
-        print("2. You should see '● Live Data' in the top right corner")
-        print()
+        out("🎉 All tables connected successfully!")
+        out()
+        out("Next steps:")
+        out("1. Run the dashboard: streamlit run zeofill_dashboard.py")
+        out("2. You should see '● Live Data' in the top right corner")
+        out()
     elif success_count > 0:
-        print("⚠️  Some tables connected successfully, but there are issues:")
-        print()
+        out("⚠️  Some tables connected successfully, but there are issues:")
+        out()
         if empty_count > 0:
-            print("Empty tables detected:")
+            out("Empty tables detected:")
             for channel, result in results.items():
                 if result['status'] == 'empty':
-                    print(f"  - {channel}: Add data to {tables[channel]} table")
-            print()
+                    out(f"  - {channel}: Add data to {tables[channel]} table")
+            out()
         if error_count > 0:
-            print("Connection errors detected:")
+            out("Connection errors detected:")
             for channel, result in results.items():
                 if result['status'] == 'error':
-                    print(f"  - {channel}: Check if {tables[channel]} table exists")
-            print()
-        print("The dashboard will still work but will use sample data for failed channels.")
-        print()
+                    out(f"  - {channel}: Check if {tables[channel]} table exists")
+            out()
+        out("The dashboard will still work but will use sample data for failed channels.")
+        out()
     else:
-        print("❌ No tables could be connected.")
-        print()
-        print("Troubleshooting:")
-        print("1. Verify table names in Supabase match:")
-        for channel, table in tables.items():
-            print(f"   - {table}")
-        print("2. Check Row Level Security (RLS) policies allow SELECT")
-        print("3. Verify your SUPABASE_KEY has correct permissions")
-        print()
+        out("❌ No tables could be connected.")
+        out()
+        out("Troubleshooting:")
+        out("1. Verify table names in Supabase match:")
+        for table in tables.values():
+            out(f"   - {table}")
+        out("2. Check Row Level Security (RLS) policies allow SELECT")
+        out("3. Verify your SUPABASE_KEY has correct permissions")
+        out()
+
+    if any(
+        marker in result['error'].lower()
+        for result in results.values() if result['status'] == 'error'
+        for marker in CONNECTION_LIMIT_ERRORS
+    ):
+        out("Database connection limit reached:")
+        out("   This script goes through the REST API, which already uses a server-side pool.")
+        out("   Check other direct Postgres clients (scripts, CI jobs) - they should connect")
+        out("   through the transaction pooler on port 6543 instead of the session port 5432.")
+        out()
+    flush_output()
 
     # Step 6: Show sample data (if available)
     for channel, result in results.items():
         if result['status'] == 'success' and result['sample']:
-            print(f"Sample record from {channel}:")
-            sample = result['sample']
-            # Show first 5 key fields
-            keys = list(sample.keys())[:5]
-            for key in keys:
-                value = str(sample[key])
-                if len(value) > 50:
-                    value = value[:50] + "..."
-                print(f"  {key}: {value}")
-            print()
+            out(f"Sample record from {channel}:")
+            # First 5 key fields, formatted when the probe returned
+            out(result['sample_block'])
+            out()
+    flush_output()
+
+    if JSON_MODE:
+        write_json(results)
 
 
 if __name__ == "__main__":
     try:
         test_connection()
     except KeyboardInterrupt:
-        print("\n\n❌ Test cancelled by user (Ctrl+C)")
+        out("\n\n❌ Test cancelled by user (Ctrl+C)")
+        flush_output()
         sys.exit(1)
     except Exception as e:
-        print(f"\n\n❌ Unexpected error: {str(e)}")
+        out(f"\n\n❌ Unexpected error: {e}")
+        flush_output()
         import traceback
         traceback.print_exc()
         sys.exit(1)
@@ -1,12 +1,24 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Tuple
 import streamlit.components.v1 as components
 import hashlib
+import io
+import math
+import re
+import time
+from functools import lru_cache
+from config import get_config
+
+# Plotly is imported inside the chart code, so the login screen renders
+# without loading it
+if TYPE_CHECKING:
+   import plotly.graph_objects as go
+
+
+APP_CONFIG = get_config()
 
 
 # --- HELPER FUNCTIONS ---
@@ -89,14 +101,7 @@ def check_password():
         st.markdown('<div class="login-container">', unsafe_allow_html=True)
 
         # Display company logo
-        try:
-            logo_path = Path("assets/company-logo.jpg")
-            if logo_path.exists():
-                st.image(str(logo_path), use_container_width=False, width=200)
-            else:
-                st.markdown('<div class="login-logo">🐾 ZeoFill</div>', unsafe_allow_html=True)
-        except:
-            st.markdown('<div class="login-logo">🐾 ZeoFill</div>', unsafe_allow_html=True)
+        st.markdown(LOGIN_LOGO_HTML, unsafe_allow_html=True)
 
         st.markdown('<div class="login-subtitle"><span class="lock-icon">🔒</span> Enter password to access dashboard</div>', unsafe_allow_html=True)
 
@@ -123,7 +128,7 @@ def check_password():
 
 # Import Supabase integration
 try:
-    from supabase_integration import fetch_all_order_data
+    from supabase_integration import clear_order_data_cache, fetch_all_order_data
     SUPABASE_AVAILABLE = True
 except ImportError:
     SUPABASE_AVAILABLE = False
@@ -131,28 +136,49 @@ except ImportError:
 
 # Logo URLs - Use local file for company logo
 import base64
-from pathlib import Path
 
-def get_local_image_base64(image_path):
-    """Convert local image to base64 for embedding in HTML"""
+# Assets are read and encoded once per server process, not on every rerun
+@st.cache_resource(show_spinner=False)
+def load_local_image(image_path):
+    """Read a local image file, or return None if it doesn't exist"""
     try:
         with open(image_path, "rb") as f:
-            data = f.read()
-        return f"data:image/jpeg;base64,{base64.b64encode(data).decode()}"
+            return f.read()
     except FileNotFoundError:
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def get_local_image_base64(image_path):
+    """Convert local image to base64 for embedding in HTML"""
+    data = load_local_image(image_path)
+    if data is None:
         # Fallback to online URL if file not found
         return "https://zeofill.com/wp-content/uploads/2018/01/ZeoFill-Logo-Retina.png"
+    return f"data:image/jpeg;base64,{base64.b64encode(data).decode()}"
 
 # Try to load local logo, fallback to URL if not found
 ZEOFILL_LOGO_URL = get_local_image_base64("assets/company-logo.jpg")
+# Login logo as an inline <img> from the encoded data URL; text mark if the file is missing
+if ZEOFILL_LOGO_URL.startswith("data:"):
+    LOGIN_LOGO_HTML = f'<div class="login-logo"><img src="{ZEOFILL_LOGO_URL}" width="200" /></div>'
+else:
+    LOGIN_LOGO_HTML = '<div class="login-logo">🐾 ZeoFill</div>'
 SHOPIFY_LOGO_URL = "https://cdn.icon-icons.com/icons2/2429/PNG/512/shopify_logo_icon_147243.png"
 WALMART_LOGO_URL = "https://cdn.icon-icons.com/icons2/2699/PNG/512/walmart_logo_icon_170230.png"
 AMAZON_LOGO_URL = "https://cdn.icon-icons.com/icons2/2699/PNG/512/amazon_logo_icon_170594.png"
 
 
 # --- CSS STYLING ---
+def _minify_css(css):
+   """Drop comments and collapse whitespace so the sheet is sent as one compact line"""
+   css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+   css = re.sub(r"\s+", " ", css)
+   return re.sub(r"\s*([{};])\s*", r"\1", css).strip()
+
+
 # We inject this CSS to handle the vertical alignment and card styling
-KPI_CSS = """
+KPI_CSS = _minify_css("""
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
 :root {
@@ -388,11 +414,11 @@ div[data-testid="stVerticalBlock"] {
 
 
 </style>
-"""
+""")
 
 
-def load_css():
-   st.markdown("""
+# App-wide sheet; re-emitted every rerun since Streamlit drops elements a run doesn't redraw
+APP_CSS = _minify_css("""
    <style>
    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
 
@@ -501,102 +527,398 @@ def load_css():
    }
               
    </style>
-   """, unsafe_allow_html=True)
+   """)
+
+
+def load_css():
+   st.markdown(APP_CSS, unsafe_allow_html=True)
 
 
 # --- DATA & METRICS ---
-@st.cache_data
+# Sample order generator settings per channel: (channel, base daily orders,
+# revenue range, refund probability, COGS ratio range, shipping range,
+# platform fee rate, fixed fee per order, state weights or None for uniform)
+SAMPLE_CHANNELS = (
+   ('Shopify', 8, (50, 300), 0.05, (0.35, 0.45), (5, 15), 0.029, 0.30,
+    [0.3, 0.2, 0.1, 0.1, 0.1, 0.05, 0.05, 0.05, 0.025, 0.025]),
+   ('Walmart', 5, (80, 400), 0.03, (0.40, 0.50), (8, 20), 0.15, 0.0, None),
+   ('Amazon', 6, (60, 350), 0.04, (0.38, 0.48), (6, 18), 0.15, 0.99, None)
+)
+
+
+# Shared read-only frame (no per-hit copy); refreshed hourly so the dates
+# keep ending today
+@st.cache_resource(ttl=3600)
 def generate_sample_data():
-   np.random.seed(42)
+   rng = np.random.default_rng(42)
    # Generate 6 months of data to allow for meaningful growth charts
    end_date = datetime.now()
    start_date = end_date - timedelta(days=210)
    dates = pd.date_range(start=start_date, end=end_date, freq='D')
    products_list = ["ZeoFill Infill (50lb)", "ZeoFill Infill (Pallet)", "Pet Deodorizer 32oz", "Pet Deodorizer 1Gal", "Turf Rake", "Odor Neutralizer"]
    states_list = ['CA', 'TX', 'FL', 'NY', 'AZ', 'NV', 'WA', 'CO', 'IL', 'GA']
-   data = []
-  
+   # Categories in sorted order (as astype('category') would give); draws pick
+   # positions in the original lists, remapped to codes
+   state_cats, state_codes = np.unique(states_list, return_inverse=True)
+   product_cats, product_codes = np.unique(products_list, return_inverse=True)
+
    # Simulate a growth trend
    growth_factor = np.linspace(0.8, 1.3, len(dates)) # Revenue grows over time
 
+   # Draw every order of a channel at once: daily counts, then one array per
+   # column; each column is concatenated across channels and built into the frame once
+   parts = {col: [] for col in ('date', 'channel', 'revenue', 'cogs', 'shipping_cost', 'platform_fee',
+                                'is_refund', 'state', 'products')}
+   for (channel, base_orders, (rev_lo, rev_hi), refund_p, (cogs_lo, cogs_hi),
+        (ship_lo, ship_hi), fee_rate, fee_fixed, state_p) in SAMPLE_CHANNELS:
+       counts = rng.poisson(base_orders * growth_factor)
+       n = int(counts.sum())
+       rev = rng.uniform(rev_lo, rev_hi, n)
+       parts['date'].append(dates.values.repeat(counts))
+       parts['channel'].append(np.full(n, APP_CONFIG.channels.index(channel), dtype=np.int8))
+       parts['revenue'].append(rev)
+       # Branchless refund draw: one uniform per order compared against the rate
+       parts['is_refund'].append(rng.random(n) < refund_p)
+       parts['cogs'].append(rev * rng.uniform(cogs_lo, cogs_hi, n))
+       parts['shipping_cost'].append(rng.uniform(ship_lo, ship_hi, n))
+       parts['platform_fee'].append(rev * fee_rate + fee_fixed)
+       parts['state'].append(state_codes[rng.choice(len(states_list), n, p=state_p)])
+       parts['products'].append(product_codes[rng.choice(len(products_list), n)])
+   # Interleave channels by date, as if orders were recorded day by day
+   date = np.concatenate(parts['date'])
+   order = np.argsort(date, kind='stable')
+   cols = {col: np.concatenate(arrays)[order] for col, arrays in parts.items()}
+   rev, is_refund = cols['revenue'], cols['is_refund']
+   refund_amount = np.where(is_refund, rev, 0.0)
+   net_revenue = rev - refund_amount
+   gross_profit = net_revenue - cols['cogs']
+
+   # Repeated low-cardinality text as categoricals built straight from int8 codes;
+   # channel uses the same fixed categories as the Supabase data. Money stays
+   # float64 so totals keep exact cents.
+   return pd.DataFrame({
+       'date': cols['date'],
+       'channel': pd.Categorical.from_codes(cols['channel'], categories=APP_CONFIG.channels),
+       'revenue': rev, 'cogs': cols['cogs'], 'shipping_cost': cols['shipping_cost'],
+       'platform_fee': cols['platform_fee'],
+       'financial_status': pd.Categorical.from_codes(is_refund.view(np.int8), ['paid', 'refunded']),
+       'state': pd.Categorical.from_codes(cols['state'], state_cats),
+       'products': pd.Categorical.from_codes(cols['products'], product_cats),
+       'refund_amount': refund_amount, 'net_revenue': net_revenue, 'gross_profit': gross_profit,
+       'net_profit': gross_profit - cols['shipping_cost'] - cols['platform_fee']
+   })
+
+
+# Shared read-only across sessions; expires with the same 5 minutes as the
+# channel fetches, and the header's Refresh button clears it early
+@st.cache_resource(ttl=300, show_spinner="Loading orders...")
+def load_order_data() -> pd.DataFrame:
+   """Combined Supabase orders, or the sample data when Supabase is unavailable or returns nothing."""
+   df_full = fetch_all_order_data() if SUPABASE_AVAILABLE else None
+   if df_full is None or df_full.empty:
+       # Shallow copy, so stamping the version leaves the shared sample frame alone
+       df_full = generate_sample_data().copy(deep=False)
+   # Every load gets a new version; the per-frame caches key on it, so a
+   # reload never reuses results computed from older data
+   df_full.attrs['data_version'] = time.time_ns()
+   return df_full
 
-   for idx, date in enumerate(dates):
-       gf = growth_factor[idx]
-       # Shopify
-       n_shop = np.random.poisson(8 * gf)
-       for _ in range(n_shop):
-           rev = np.random.uniform(50, 300)
-           is_refund = np.random.random() < 0.05
-           data.append({
-               'date': date, 'channel': 'Shopify', 'revenue': rev,
-               'cogs': rev * np.random.uniform(0.35, 0.45), 'shipping_cost': np.random.uniform(5, 15),
-               'platform_fee': rev * 0.029 + 0.30, 'financial_status': 'refunded' if is_refund else 'paid',
-               'state': np.random.choice(states_list, p=[0.3, 0.2, 0.1, 0.1, 0.1, 0.05, 0.05, 0.05, 0.025, 0.025]),
-               'products': np.random.choice(products_list)
-           })
-       # Walmart
-       n_wal = np.random.poisson(5 * gf)
-       for _ in range(n_wal):
-           rev = np.random.uniform(80, 400)
-           is_refund = np.random.random() < 0.03
-           data.append({
-               'date': date, 'channel': 'Walmart', 'revenue': rev,
-               'cogs': rev * np.random.uniform(0.40, 0.50), 'shipping_cost': np.random.uniform(8, 20),
-               'platform_fee': rev * 0.15, 'financial_status': 'refunded' if is_refund else 'paid',
-               'state': np.random.choice(states_list), 'products': np.random.choice(products_list)
-           })
-       # Amazon
-       n_amz = np.random.poisson(6 * gf)
-       for _ in range(n_amz):
-           rev = np.random.uniform(60, 350)
-           is_refund = np.random.random() < 0.04
-           data.append({
-               'date': date, 'channel': 'Amazon', 'revenue': rev,
-               'cogs': rev * np.random.uniform(0.38, 0.48), 'shipping_cost': np.random.uniform(6, 18),
-               'platform_fee': (rev * 0.15) + 0.99, 'financial_status': 'refunded' if is_refund else 'paid',
-               'state': np.random.choice(states_list), 'products': np.random.choice(products_list)
-           })
-   df = pd.DataFrame(data)
-   df['refund_amount'] = df.apply(lambda x: x['revenue'] if x['financial_status'] == 'refunded' else 0, axis=1)
-   df['net_revenue'] = df['revenue'] - df['refund_amount']
-   df['gross_profit'] = df['net_revenue'] - df['cogs']
-   df['net_profit'] = df['gross_profit'] - df['shipping_cost'] - df['platform_fee']
-   return df
 
+# Money columns every order frame has, summed together by calculate_metrics
+METRIC_SUM_COLUMNS = ['revenue', 'net_revenue', 'gross_profit', 'net_profit', 'cogs',
+                      'platform_fee', 'shipping_cost', 'refund_amount']
 
-def calculate_metrics(df: pd.DataFrame, df_prev: pd.DataFrame = None) -> Dict:
-   # Calculate tax owed (only from Shopify channel)
-   df_shopify = df[df['channel'] == 'Shopify']
-   total_tax_owed = 0
-   if not df_shopify.empty and 'tax' in df_shopify.columns:
-       total_tax_owed = df_shopify['tax'].sum()
 
-   # Calculate total discounts (if discount column exists)
-   total_discounts = 0
-   if 'discount' in df.columns:
-       total_discounts = df['discount'].sum()
+def column_sums(df: pd.DataFrame, columns: List[str]) -> Dict[str, float]:
+   """Sum several float columns in one NumPy pass (NaN counts as 0, like Series.sum)."""
+   return dict(zip(columns, np.nansum(df[columns].to_numpy(dtype=np.float64), axis=0).tolist()))
+
 
+# Cost breakdown panel entries, in display order
+COST_METRIC_KEYS = ('total_cogs', 'total_fees', 'total_tax_owed', 'total_shipping',
+                    'total_refunds', 'total_discounts')
+
+
+def calculate_metrics(df: pd.DataFrame, df_prev: pd.DataFrame = None) -> Dict:
+   # Calculate tax owed (only from Shopify channel), masking the tax array
+   # rather than copying out the Shopify rows
+   total_tax_owed = 0
+   if 'tax' in df.columns:
+       is_shopify = (df['channel'] == 'Shopify').to_numpy(dtype=bool)
+       if is_shopify.any():
+           total_tax_owed = float(np.nansum(df['tax'].to_numpy(dtype=np.float64)[is_shopify]))
+
+   # One reduction over all money columns (plus discount, if present) instead of a .sum() per metric
+   has_discount = 'discount' in df.columns
+   sums = column_sums(df, METRIC_SUM_COLUMNS + ['discount'] if has_discount else METRIC_SUM_COLUMNS)
+   total_discounts = sums['discount'] if has_discount else 0
    metrics = {
-       'total_revenue': df['revenue'].sum(), 'net_revenue': df['net_revenue'].sum(),
-       'gross_profit': df['gross_profit'].sum(), 'net_profit': df['net_profit'].sum(),
-       'total_orders': len(df), 'avg_order_value': df['net_revenue'].sum() / len(df) if len(df) > 0 else 0,
-       'refund_rate': (df['refund_amount'].sum() / df['revenue'].sum() * 100) if df['revenue'].sum() > 0 else 0,
-       'gross_margin': (df['gross_profit'].sum() / df['net_revenue'].sum() * 100) if df['net_revenue'].sum() > 0 else 0,
-       'net_margin': (df['net_profit'].sum() / df['net_revenue'].sum() * 100) if df['net_revenue'].sum() > 0 else 0,
-       'total_cogs': df['cogs'].sum(), 'total_fees': df['platform_fee'].sum(),
-       'total_shipping': df['shipping_cost'].sum(), 'total_refunds': df['refund_amount'].sum(),
+       'total_revenue': sums['revenue'], 'net_revenue': sums['net_revenue'],
+       'gross_profit': sums['gross_profit'], 'net_profit': sums['net_profit'],
+       'total_orders': len(df), 'avg_order_value': sums['net_revenue'] / len(df) if len(df) > 0 else 0,
+       'refund_rate': (sums['refund_amount'] / sums['revenue'] * 100) if sums['revenue'] > 0 else 0,
+       'gross_margin': (sums['gross_profit'] / sums['net_revenue'] * 100) if sums['net_revenue'] > 0 else 0,
+       'net_margin': (sums['net_profit'] / sums['net_revenue'] * 100) if sums['net_revenue'] > 0 else 0,
+       'total_cogs': sums['cogs'], 'total_fees': sums['platform_fee'],
+       'total_shipping': sums['shipping_cost'], 'total_refunds': sums['refund_amount'],
        'total_tax_owed': total_tax_owed, 'total_discounts': total_discounts
    }
    if df_prev is not None and len(df_prev) > 0:
+       prev_sums = column_sums(df_prev, ['revenue', 'net_revenue', 'net_profit'])
        prev_metrics = {
-           'total_revenue': df_prev['revenue'].sum(), 'net_profit': df_prev['net_profit'].sum(),
-           'total_orders': len(df_prev), 'avg_order_value': df_prev['net_revenue'].sum() / len(df_prev) if len(df_prev) > 0 else 0,
+           'total_revenue': prev_sums['revenue'], 'net_profit': prev_sums['net_profit'],
+           'total_orders': len(df_prev), 'avg_order_value': prev_sums['net_revenue'] / len(df_prev),
        }
        for key in ['total_revenue', 'net_profit', 'total_orders', 'avg_order_value']:
            metrics[f'{key}_delta'] = ((metrics[key] - prev_metrics[key]) / prev_metrics[key] * 100) if prev_metrics[key] > 0 else 0
    return metrics
 
 
+def _frame_fingerprint(df: pd.DataFrame) -> Tuple:
+   """
+   Cache key for an order frame: the load it came from and the rows it holds.
+
+   Frames derived from a load (slices, filters, takes) inherit its
+   data_version through attrs and keep its row labels, so the version plus a
+   digest of the index identifies them without hashing every column.
+   Re-indexed frames also digest their dates; frames with no version are
+   keyed on their full contents.
+   """
+   version = df.attrs.get('data_version')
+   if version is None:
+       return ('content', tuple(df.columns), hashlib.md5(pd.util.hash_pandas_object(df).to_numpy().tobytes()).hexdigest())
+   digest = hashlib.md5(pd.util.hash_pandas_object(df.index, index=False).to_numpy().tobytes())
+   if isinstance(df.index, pd.RangeIndex) and 'date' in df.columns:
+       digest.update(pd.util.hash_pandas_object(df['date'], index=False).to_numpy().tobytes())
+   return (version, len(df), tuple(df.columns), digest.hexdigest())
+
+
+def _data_version(df: pd.DataFrame) -> Tuple:
+   """
+   Cache key for results built from a whole loaded frame (e.g. row positions).
+
+   The load's data_version alone, so positions are never reused across
+   loads; falls back to the full fingerprint for frames without a version.
+   """
+   version = df.attrs.get('data_version')
+   if version is None:
+       return _frame_fingerprint(df)
+   return ('version', version, len(df))
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
+def cached_metrics(df: pd.DataFrame, df_prev: pd.DataFrame = None) -> Dict:
+   """calculate_metrics, cached per (current, previous) frame pair so unchanged views skip the pass."""
+   return calculate_metrics(df, df_prev)
+
+
+def count_states(state: pd.Series) -> pd.DataFrame:
+   """Orders per state, most first, as a ['state', 'orders'] frame (unseen states left out)."""
+   if not isinstance(state.dtype, pd.CategoricalDtype):
+       state = state.astype('category')
+   # Count the integer codes directly (code -1 is a missing state)
+   codes = state.cat.codes.to_numpy()
+   counts = np.bincount(codes[codes >= 0], minlength=len(state.cat.categories))
+   seen = np.flatnonzero(counts)
+   order = seen[np.argsort(-counts[seen], kind='stable')]
+   return pd.DataFrame({'state': state.cat.categories[order], 'orders': counts[order]})
+
+
+def total_by_product(df: pd.DataFrame) -> pd.DataFrame:
+   """Revenue and order count per product (products seen in df only), indexed by product."""
+   products = df['products']
+   if not isinstance(products.dtype, pd.CategoricalDtype):
+       products = products.astype('category')
+   # Weighted bincounts over the category codes: one pass per output column,
+   # no hashing or take (code -1 is a missing product)
+   codes = products.cat.codes.to_numpy()
+   valid = codes >= 0
+   codes = codes[valid]
+   n = len(products.cat.categories)
+   rows = np.bincount(codes, minlength=n)
+   revenue = np.bincount(codes, weights=np.nan_to_num(df['revenue'].to_numpy()[valid]), minlength=n).astype(np.float64)
+   orders = np.bincount(codes, weights=df['date'].notna().to_numpy()[valid], minlength=n).astype(np.int64)
+   seen = np.flatnonzero(rows)
+   index = pd.CategoricalIndex(products.cat.categories[seen], dtype=products.dtype, name='products')
+   return pd.DataFrame({'revenue': revenue[seen], 'orders': orders[seen]}, index=index)
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
+def precompute_aggregates(df: pd.DataFrame) -> Dict:
+   """Aggregate the filtered frame once for every chart of the current selection."""
+   product_totals = total_by_product(df)
+   state_counts = count_states(df['state'])
+   return {
+       'daily_by_channel': df.groupby(['date', 'channel'], observed=True)['revenue'].sum().reset_index(),
+       'daily_totals': df.groupby('date')[['revenue', 'gross_profit', 'net_profit']].sum().reset_index(),
+       'channel_totals': df.groupby('channel', observed=True)[['revenue', 'gross_profit']].sum().reset_index(),
+       'state_counts': state_counts,
+       'product_totals': product_totals,
+       'waterfall_sums': df[['revenue', 'refund_amount', 'cogs', 'shipping_cost', 'platform_fee', 'net_profit']].sum().to_dict(),
+       # Newest order date, the end of the KPI window
+       'last_date': df['date'].max()
+   }
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
+def precompute_monthly_totals(df: pd.DataFrame) -> pd.DataFrame:
+   """Monthly revenue and net profit, shared by the Growth cards and charts."""
+   dates = df['date'].to_numpy()
+   valid = ~np.isnat(dates)
+   if not valid.any():
+       return pd.DataFrame({'date': dates[:0].astype('datetime64[ns]'), 'revenue': np.zeros(0), 'net_profit': np.zeros(0)})
+   # Bin by month offset with weighted bincounts instead of resample's sort
+   # and group; empty months come out as zero rows, as with resample
+   months = dates[valid].astype('datetime64[M]')
+   first = months.min()
+   offsets = (months - first).astype(np.int64)
+   n_months = int(offsets.max()) + 1
+   totals = {col: np.bincount(offsets, weights=np.nan_to_num(df[col].to_numpy()[valid]), minlength=n_months)
+             for col in ('revenue', 'net_profit')}
+   # Label each month by its last day, like resample('M')
+   month_ends = (first + np.arange(1, n_months + 1)).astype('datetime64[D]') - np.timedelta64(1, 'D')
+   return pd.DataFrame({'date': month_ends.astype('datetime64[ns]'), **totals})
+
+
+def slice_dates(df: pd.DataFrame, start, end, include_end: bool = True) -> pd.DataFrame:
+   """
+   Rows of df dated from start up to end.
+
+   Date-sorted frames (the loaders sort by date) are sliced with a binary
+   search instead of building two full-length masks.
+
+   Args:
+       df: Order frame
+       start: First date to keep
+       end: Last date to keep
+       include_end: Keep rows dated exactly end
+
+   Returns:
+       DataFrame with the rows in the window
+   """
+   dates = df['date']
+   if not dates.is_monotonic_increasing:
+       upper = dates <= end if include_end else dates < end
+       return df[(dates >= start) & upper]
+   values = dates.to_numpy()
+   lo = values.searchsorted(pd.Timestamp(start).to_datetime64(), side='left')
+   hi = values.searchsorted(pd.Timestamp(end).to_datetime64(), side='right' if include_end else 'left')
+   return df.iloc[lo:hi]
+
+
+# Shared read-only across sessions, so the dict isn't copied on every hit
+@st.cache_resource(show_spinner=False, hash_funcs={pd.DataFrame: _data_version})
+def build_order_index(df_full: pd.DataFrame) -> Dict[str, np.ndarray]:
+   """Row positions for each lower-cased order_id, for exact order-number lookups."""
+   order_ids = df_full['order_id'].str.lower()
+   return order_ids.groupby(order_ids, sort=False).indices
+
+
+@st.cache_data(show_spinner=False, max_entries=32, hash_funcs={pd.DataFrame: _frame_fingerprint})
+def apply_filters(df_full: pd.DataFrame, start, end, channels: Tuple[str, ...], search_term: str) -> pd.DataFrame:
+   """
+   Rows of df_full matching the dashboard filters.
+
+   Cached per filter combination, so reruns that leave the filters alone
+   (e.g. switching tabs) skip rebuilding the masks.
+
+   Args:
+       df_full: Full order frame
+       start: Start of the date window, or None for all dates
+       end: End of the date window, or None for all dates
+       channels: Channels to keep; empty keeps every channel
+       search_term: Order number or fragment; when set, the date window is
+           ignored. An exact order number matches only that order.
+
+   Returns:
+       Filtered DataFrame
+   """
+   if search_term:
+       # Search in order_id column (which contains order numbers for all channels):
+       # a full order number is a dict lookup, anything else a substring match
+       rows = build_order_index(df_full).get(search_term.lower())
+       if rows is not None:
+           df = df_full.iloc[rows]
+       else:
+           df = df_full[df_full['order_id'].str.contains(search_term, case=False, regex=False, na=False)]
+   elif start is None:
+       df = df_full
+   else:
+       df = slice_dates(df_full, start, end)
+
+   # Apply channel filter
+   if channels:
+       df = df[df['channel'].isin(channels)]
+   return df
+
+
+# Shared read-only across sessions, like the order index
+@st.cache_resource(show_spinner=False, hash_funcs={pd.DataFrame: _data_version})
+def build_channel_index(df_full: pd.DataFrame) -> Dict[str, np.ndarray]:
+   """Ascending row positions of each channel, from one pass over the channel codes."""
+   return df_full.groupby('channel', observed=True, sort=False).indices
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _data_version})
+def compute_unfulfilled(df_full: pd.DataFrame) -> pd.DataFrame:
+   """
+   Unfulfilled orders across all channels, using each channel's own criteria.
+
+   Each channel's criteria are only evaluated on that channel's rows (taken
+   from the cached channel index); rows are taken Shopify first, then
+   Amazon, then Walmart. Cached per load (data_version), so a reload with
+   changed statuses is re-evaluated.
+   """
+   channel_rows = build_channel_index(df_full)
+   no_rows = np.empty(0, dtype=np.intp)
+   fulfillment = df_full['fulfillment_status']
+
+   # Shopify: shipping_terms not null AND financial_status='paid' AND fulfillment_status='unfulfilled'
+   # The string tests on shipping_terms only run on rows passing the categorical tests
+   shopify = channel_rows.get('Shopify', no_rows)
+   shopify = shopify[(df_full['financial_status'].take(shopify) == 'paid').to_numpy(dtype=bool)
+                     & (fulfillment.take(shopify) == 'unfulfilled').to_numpy(dtype=bool)]
+   terms = df_full['shipping_terms'].take(shopify)
+   shopify = shopify[(terms.notna() & (terms != 'None')).to_numpy(dtype=bool)]
+
+   # Amazon: order_status='Pending'
+   amazon = channel_rows.get('Amazon', no_rows)
+   amazon = amazon[(df_full['order_status'].take(amazon) == 'Pending').to_numpy(dtype=bool)]
+
+   # Walmart: fulfillment_status NOT IN ('Delivered', 'Shipped', 'Cancelled')
+   walmart = channel_rows.get('Walmart', no_rows)
+   walmart = walmart[~fulfillment.take(walmart).isin(['Delivered', 'Shipped', 'Cancelled']).to_numpy(dtype=bool)]
+
+   rows = np.concatenate([shopify, amazon, walmart])
+   return df_full.take(rows).reset_index(drop=True)
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
+def unfulfilled_breakdown(df_unfulfilled: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+   """
+   Per-channel totals and top-10 states for the Unfulfilled tab.
+
+   Both come from one channel x state groupby; rows with a missing state stay
+   in the channel totals but are left out of the state counts.
+   """
+   by_pair = df_unfulfilled.groupby(['channel', 'state'], observed=True, sort=False, dropna=False).agg(
+       revenue=('revenue', 'sum'), count=('order_id', 'count'), rows=('revenue', 'size')
+   )
+   channel_counts = by_pair.groupby(level='channel', observed=True)[['revenue', 'count']].sum().reset_index()
+   state_rows = by_pair.groupby(level='state', observed=True)['rows'].sum()
+   # nlargest selects the top 10 without sorting every state
+   state_counts = state_rows.nlargest(10).reset_index()
+   state_counts.columns = ['state', 'count']
+   return channel_counts, state_counts
+
+
+def clear_frame_caches() -> None:
+   """Drop the per-frame caches; after a reload their entries (keyed on the old data_version) can't hit again."""
+   for cached in (cached_metrics, precompute_aggregates, precompute_monthly_totals, build_order_index,
+                  apply_filters, build_channel_index, compute_unfulfilled, unfulfilled_breakdown):
+       cached.clear()
+
+
 def apply_chart_theme(fig, height=300):
    fig.update_layout(
        template='plotly_dark', paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
@@ -613,9 +935,18 @@ def apply_chart_theme(fig, height=300):
 
 
 # --- SVG GENERATORS ---
+# Ring path radius is 15.9155, so the full stroke length is ~100 units
+CIRCUMFERENCE = 15.9155 * 2 * math.pi
+
+
 def get_top_kpi_circle(percentage, label, color_hex="#2DD4BF"):
-   radius = 15.9155
-   circumference = radius * 2 * 3.14159
+   # Percentages only display to 2 decimals, so round before hitting the cache
+   return _top_kpi_circle_svg(round(float(percentage), 2), label, color_hex)
+
+
+@lru_cache(maxsize=256)
+def _top_kpi_circle_svg(percentage, label, color_hex):
+   circumference = CIRCUMFERENCE
    offset = circumference - (percentage / 100) * circumference
   
    # Format percentage to 2 decimals
@@ -632,8 +963,12 @@ def get_top_kpi_circle(percentage, label, color_hex="#2DD4BF"):
 
 
 def get_cost_circle(percentage, value_text, label_text, color_hex="#2DD4BF"):
-   radius = 15.9155
-   circumference = radius * 2 * 3.14159
+   return _cost_circle_svg(round(float(percentage), 2), value_text, label_text, color_hex)
+
+
+@lru_cache(maxsize=256)
+def _cost_circle_svg(percentage, value_text, label_text, color_hex):
+   circumference = CIRCUMFERENCE
    offset = circumference - (percentage / 100) * circumference
   
    # Format percentage to 2 decimals
@@ -652,21 +987,115 @@ def get_cost_circle(percentage, value_text, label_text, color_hex="#2DD4BF"):
    """
 
 
+# --- CARD HTML ---
+# Card markup is memoized on the displayed (already rounded/formatted) values,
+# so reruns with unchanged numbers reuse the same strings
+def format_delta_html(delta: float):
+   css_class = "delta-pos" if delta >= 0 else "delta-neg"
+   sign = "+" if delta >= 0 else ""
+   return f'<div class="metric-delta {css_class}">{sign}{delta:.2f}% vs prev</div>'
+
+
+@lru_cache(maxsize=128)
+def kpi_card_html(label, value_text, delta, sub_label, circle_pct, circle_label, color_hex):
+   return f"""{KPI_CSS}
+   <div class="metric-card-combined">
+       <div class="metric-main-content">
+           <div class="metric-label">{label}</div>
+           <div class="metric-value">{value_text}</div>
+           {format_delta_html(delta)}
+           <div class="metric-sub-label">{sub_label}</div>
+       </div>
+       {get_top_kpi_circle(circle_pct, circle_label, color_hex)}
+   </div>"""
+
+
+@lru_cache(maxsize=64)
+def cost_panel_html(circles):
+   """Cost panel from six (percentage, value text, label) tuples: three costs, then three summary items."""
+   rows = ["".join(get_cost_circle(pct, value_text, label) for pct, value_text, label in circles[i:i + 3])
+           for i in (0, 3)]
+   # Formatted to 2 decimals
+   return f"""{KPI_CSS}
+   <div class="cost-panel-container">
+       <div class="cost-header">Cost Breakdown</div>
+       <div class="kpi-row">{rows[0]}</div>
+       <div class="cost-header">Data Summary</div>
+       <div class="kpi-row">{rows[1]}</div>
+   </div>"""
+
+
+@lru_cache(maxsize=64)
+def growth_card_html(title, value_text, footer_html):
+   return f"""{KPI_CSS}
+   <div class="growth-kpi-container">
+       <div class="growth-title">{title}</div>
+       <div class="growth-value">{value_text}</div>
+       {footer_html}
+   </div>
+   """
+
+
 # --- CHART FUNCTIONS ---
-def chart_revenue_trend(df):
-   daily = df.groupby(['date', 'channel'])['revenue'].sum().reset_index()
-   daily['revenue_smooth'] = daily.groupby('channel')['revenue'].transform(lambda x: x.rolling(7, min_periods=1).mean())
+# Longest line trace sent to the browser; longer series are downsampled with LTTB
+MAX_TRACE_POINTS = 2500
+
+
+def lttb_indices(x, y, max_points=MAX_TRACE_POINTS) -> np.ndarray:
+   """
+   Positions kept by Largest-Triangle-Three-Buckets downsampling.
+
+   The interior points are split into max_points - 2 buckets, and from each
+   bucket the point forming the largest triangle with the previously kept
+   point and the next bucket's average is kept, so peaks and dips survive.
+   Series already within max_points are returned whole.
+   """
+   n = len(y)
+   if n <= max_points or max_points < 3:
+       return np.arange(n)
+   x = np.asarray(x)
+   if np.issubdtype(x.dtype, np.datetime64):
+       x = x.astype('datetime64[ns]').view('int64')
+   x = x.astype('float64')
+   y = np.nan_to_num(np.asarray(y, dtype='float64'))
+
+   edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+   keep = np.empty(max_points, dtype=np.int64)
+   keep[0], keep[-1] = 0, n - 1
+   a = 0
+   for i in range(max_points - 2):
+       lo, hi = edges[i], edges[i + 1]
+       nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+       avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+       area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+       a = lo + int(area.argmax())
+       keep[i + 1] = a
+   return keep
+
+
+def chart_revenue_trend(daily_by_channel):
+   import plotly.express as px
+   daily = daily_by_channel.copy()
+   # 7-order rolling mean per channel, computed by the grouped rolling kernel and aligned back by index
+   daily['revenue_smooth'] = (daily.groupby('channel', observed=True)['revenue']
+                              .rolling(7, min_periods=1).mean().reset_index(level=0, drop=True))
+   # Cap each channel's line at MAX_TRACE_POINTS
+   if daily.groupby('channel', observed=True).size().max() > MAX_TRACE_POINTS:
+       keep = [g.index[lttb_indices(g['date'], g['revenue_smooth'])]
+               for _, g in daily.groupby('channel', observed=True)]
+       daily = daily.loc[np.sort(np.concatenate(keep))]
+   # WebGL lines: one draw call instead of an SVG path per trace
    fig = px.line(daily, x='date', y='revenue_smooth', color='channel',
                  color_discrete_map={'Shopify': '#2DD4BF', 'Walmart': '#818CF8', 'Amazon': '#FF9900'},
-                 labels={'revenue_smooth': 'Revenue', 'date': 'Date'})
+                 labels={'revenue_smooth': 'Revenue', 'date': 'Date'}, render_mode='webgl')
    # Rounded to 2 decimals
    fig.update_traces(line=dict(width=3), hovertemplate='<b>%{x|%b %d}</b><br>Revenue: $%{y:,.2f}<extra></extra>')
    return apply_chart_theme(fig, height=350)
 
 
-def chart_channel_bar(df):
-   totals = df.groupby('channel').agg({'revenue': 'sum'}).reset_index()
-   fig = px.bar(totals, x='channel', y='revenue', color='channel',
+def chart_channel_bar(channel_totals):
+   import plotly.express as px
+   fig = px.bar(channel_totals, x='channel', y='revenue', color='channel',
                 color_discrete_map={'Shopify': '#2DD4BF', 'Walmart': '#818CF8', 'Amazon': '#FF9900'},
                 text='revenue')
    # Rounded to 2 decimals
@@ -675,9 +1104,8 @@ def chart_channel_bar(df):
    return apply_chart_theme(fig, height=350)
 
 
-def chart_heatmap(df):
-   state_counts = df['state'].value_counts().reset_index()
-   state_counts.columns = ['state', 'orders']
+def chart_heatmap(state_counts):
+   import plotly.express as px
    fig = px.choropleth(state_counts, locations='state', locationmode="USA-states", color='orders',
                        scope="usa", color_continuous_scale=[[0, '#111827'], [1, '#2DD4BF']])
    fig.update_traces(hovertemplate='<b>%{location}</b><br>Orders: %{z:,}<extra></extra>')
@@ -686,9 +1114,9 @@ def chart_heatmap(df):
    return fig
 
 
-def chart_profit_donut(df):
-   totals = df.groupby('channel')['gross_profit'].sum().reset_index()
-   fig = px.pie(totals, values='gross_profit', names='channel',
+def chart_profit_donut(channel_totals):
+   import plotly.express as px
+   fig = px.pie(channel_totals, values='gross_profit', names='channel',
                 color='channel', color_discrete_map={'Shopify': '#2DD4BF', 'Walmart': '#818CF8', 'Amazon': '#FF9900'}, hole=0.6)
    # Rounded to 2 decimals
    fig.update_traces(textinfo='percent+label', textposition='outside', hovertemplate='<b>%{label}</b><br>$%{value:,.2f}<extra></extra>')
@@ -696,31 +1124,37 @@ def chart_profit_donut(df):
    return apply_chart_theme(fig, height=350)
 
 
-def chart_profit_margin_trend(df):
-   daily = df.groupby('date').agg({'revenue': 'sum', 'gross_profit': 'sum', 'net_profit': 'sum'}).reset_index()
-   daily['gross_margin'] = (daily['gross_profit'] / daily['revenue'] * 100).rolling(7).mean()
-   daily['net_margin'] = (daily['net_profit'] / daily['revenue'] * 100).rolling(7).mean()
+def chart_profit_margin_trend(daily_totals):
+   import plotly.graph_objects as go
+   daily = daily_totals.copy()
+   # Both margins in one divide + rolling pass
+   daily[['gross_margin', 'net_margin']] = (daily[['gross_profit', 'net_profit']].div(daily['revenue'], axis=0) * 100).rolling(7).mean().to_numpy()
+   # Both traces share x, so keep the union of each margin's LTTB points
+   if len(daily) > MAX_TRACE_POINTS:
+       keep = np.union1d(lttb_indices(daily['date'], daily['gross_margin']), lttb_indices(daily['date'], daily['net_margin']))
+       daily = daily.iloc[keep]
    fig = go.Figure()
-   fig.add_trace(go.Scatter(x=daily['date'], y=daily['gross_margin'], name='Gross Margin',
-                            line=dict(color='#2DD4BF', width=3), fill='tozeroy', fillcolor='rgba(45, 212, 191, 0.1)',
-                            hovertemplate='Gross Margin: %{y:.2f}%<extra></extra>')) # 2 decimals
-   fig.add_trace(go.Scatter(x=daily['date'], y=daily['net_margin'], name='Net Margin',
-                            line=dict(color='#818CF8', width=3, dash='dash'),
-                            hovertemplate='Net Margin: %{y:.2f}%<extra></extra>')) # 2 decimals
+   fig.add_trace(go.Scattergl(x=daily['date'], y=daily['gross_margin'], name='Gross Margin',
+                              line=dict(color='#2DD4BF', width=3), fill='tozeroy', fillcolor='rgba(45, 212, 191, 0.1)',
+                              hovertemplate='Gross Margin: %{y:.2f}%<extra></extra>')) # 2 decimals
+   fig.add_trace(go.Scattergl(x=daily['date'], y=daily['net_margin'], name='Net Margin',
+                              line=dict(color='#818CF8', width=3, dash='dash'),
+                              hovertemplate='Net Margin: %{y:.2f}%<extra></extra>')) # 2 decimals
    fig.update_yaxes(ticksuffix='%')
    return apply_chart_theme(fig, height=350)
 
 
-def chart_waterfall_profit(df):
-   vals = [df['revenue'].sum(), -df['refund_amount'].sum(), -df['cogs'].sum(), -df['shipping_cost'].sum(), -df['platform_fee'].sum(), df['net_profit'].sum()]
+def chart_waterfall_profit(sums):
+   import plotly.graph_objects as go
+   vals = [sums['revenue'], -sums['refund_amount'], -sums['cogs'], -sums['shipping_cost'], -sums['platform_fee'], sums['net_profit']]
    # Create custom text labels showing the actual amount (not cumulative)
    text_labels = [
-       f"${df['revenue'].sum():,.2f}",
-       f"-${df['refund_amount'].sum():,.2f}",
-       f"-${df['cogs'].sum():,.2f}",
-       f"-${df['shipping_cost'].sum():,.2f}",
-       f"-${df['platform_fee'].sum():,.2f}",
-       f"${df['net_profit'].sum():,.2f}"
+       f"${sums['revenue']:,.2f}",
+       f"-${sums['refund_amount']:,.2f}",
+       f"-${sums['cogs']:,.2f}",
+       f"-${sums['shipping_cost']:,.2f}",
+       f"-${sums['platform_fee']:,.2f}",
+       f"${sums['net_profit']:,.2f}"
    ]
    fig = go.Figure(go.Waterfall(
        name="Profit", orientation="v",
@@ -738,8 +1172,9 @@ def chart_waterfall_profit(df):
    return apply_chart_theme(fig, height=350)
 
 
-def chart_product_kpi(df):
-   prod_perf = df.groupby('products').agg({'revenue': 'sum'}).sort_values('revenue', ascending=True).reset_index()
+def chart_product_kpi(product_totals):
+   import plotly.express as px
+   prod_perf = product_totals[['revenue']].sort_values('revenue', ascending=True).reset_index()
    fig = px.bar(prod_perf, y='products', x='revenue', orientation='h',
                 text='revenue', color='revenue', color_continuous_scale="Tealgrn")
    # Rounded to 2 decimals
@@ -749,9 +1184,9 @@ def chart_product_kpi(df):
 
 
 # --- GROWTH CHARTS ---
-def chart_growth_velocity(df):
-   # Resample to Month
-   df_monthly = df.set_index('date').resample('M').agg({'revenue': 'sum'}).reset_index()
+def chart_growth_velocity(monthly_totals):
+   import plotly.graph_objects as go
+   df_monthly = monthly_totals[['date', 'revenue']].copy()
    df_monthly['prev_revenue'] = df_monthly['revenue'].shift(1)
    df_monthly['growth_rate'] = ((df_monthly['revenue'] - df_monthly['prev_revenue']) / df_monthly['prev_revenue']) * 100
    df_monthly = df_monthly.dropna()
@@ -780,8 +1215,9 @@ def chart_growth_velocity(df):
    return apply_chart_theme(fig, height=350)
 
 
-def chart_net_profit_trend(df):
-   df_monthly = df.set_index('date').resample('M').agg({'net_profit': 'sum', 'revenue': 'sum'}).reset_index()
+def chart_net_profit_trend(monthly_totals):
+   import plotly.graph_objects as go
+   df_monthly = monthly_totals.copy()
    df_monthly['net_margin'] = (df_monthly['net_profit'] / df_monthly['revenue']) * 100
   
    fig = go.Figure()
@@ -793,6 +1229,369 @@ def chart_net_profit_trend(df):
    return apply_chart_theme(fig, height=350)
 
 
+# --- UNFULFILLED CHARTS ---
+def chart_unfulfilled_channel(channel_counts):
+   import plotly.express as px
+   fig = px.bar(channel_counts, x='channel', y='count', color='channel',
+               color_discrete_map={'Shopify': '#2DD4BF', 'Walmart': '#818CF8', 'Amazon': '#FF9900'},
+               text='count')
+   fig.update_traces(textposition="outside", hovertemplate='%{x}<br>Orders: %{y}<extra></extra>')
+   fig.update_layout(showlegend=False)
+   return apply_chart_theme(fig, height=300)
+
+
+def chart_unfulfilled_state(state_counts):
+   import plotly.express as px
+   fig = px.bar(state_counts, x='state', y='count', color='count',
+               color_continuous_scale="Tealgrn", text='count')
+   fig.update_traces(textposition="outside", hovertemplate='%{x}<br>Orders: %{y}<extra></extra>')
+   fig.update_layout(showlegend=False)
+   return apply_chart_theme(fig, height=300)
+
+
+# Chart builders by name, for figure caching
+CHART_BUILDERS = {
+   'revenue_trend': chart_revenue_trend,
+   'channel_bar': chart_channel_bar,
+   'heatmap': chart_heatmap,
+   'profit_donut': chart_profit_donut,
+   'profit_margin_trend': chart_profit_margin_trend,
+   'waterfall_profit': chart_waterfall_profit,
+   'product_kpi': chart_product_kpi,
+   'growth_velocity': chart_growth_velocity,
+   'net_profit_trend': chart_net_profit_trend,
+   'unfulfilled_channel': chart_unfulfilled_channel,
+   'unfulfilled_state': chart_unfulfilled_state
+}
+
+
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def cached_chart(name: str, data) -> Dict:
+   """
+   Build a chart from its pre-aggregated input and return it as a plain dict.
+
+   Keyed on the chart name and input, so reruns that leave a chart's input
+   unchanged skip figure construction. The dict keeps the cached value
+   immutable; get_chart turns it back into a Figure.
+   """
+   return CHART_BUILDERS[name](data).to_dict()
+
+
+def get_chart(name: str, data) -> "go.Figure":
+   """
+   Figure for a chart, rebuilt from the cached dict (a fraction of the build cost).
+
+   The dict came from a validated Figure, so it is wrapped without running
+   plotly's property validation again, which is most of the rebuild time.
+   """
+   import plotly.graph_objects as go
+   return go.Figure(cached_chart(name, data), _validate=False)
+
+
+# --- TAB RENDERERS ---
+def render_overview(df: pd.DataFrame, aggregates: Dict, channels: List[str], date_preset: str, date_suffix: str):
+   """Overview tab: trend, state and channel charts, the cost panel and the channel export."""
+   r1_c1, r1_c2 = st.columns([2, 1])
+   with r1_c1:
+       st.markdown('<div class="chart-container"><div class="chart-header">Revenue Trend</div></div>', unsafe_allow_html=True)
+       st.plotly_chart(get_chart('revenue_trend', aggregates['daily_by_channel']), use_container_width=True, config={'displayModeBar': False})
+   with r1_c2:
+       st.markdown('<div class="chart-container"><div class="chart-header">Orders by State</div></div>', unsafe_allow_html=True)
+       st.plotly_chart(get_chart('heatmap', aggregates['state_counts']), use_container_width=True, config={'displayModeBar': False})
+      
+   r2_c1, r2_c2 = st.columns([2, 1.2])
+   with r2_c1:
+       st.markdown('<div class="chart-container"><div class="chart-header">Channel Revenue Split</div></div>', unsafe_allow_html=True)
+       st.plotly_chart(get_chart('channel_bar', aggregates['channel_totals']), use_container_width=True, config={'displayModeBar': False})
+   with r2_c2:
+       # Metrics for the filtered view; only this panel uses them
+       metrics_filtered = cached_metrics(df)
+       rev = metrics_filtered['total_revenue'] if metrics_filtered['total_revenue'] > 0 else 1
+       # Share of revenue for each cost, in one divide
+       costs = np.array([metrics_filtered[key] for key in COST_METRIC_KEYS], dtype=np.float64)
+       pct_cogs, pct_fees, pct_tax, pct_ship, pct_refund, pct_discount = (costs / rev * 100).tolist()
+
+       cost_html = cost_panel_html(tuple(
+           (round(pct, 2), format_currency_smart(metrics_filtered[key]), label)
+           for pct, key, label in zip(
+               (pct_cogs, pct_fees, pct_tax, pct_ship, pct_refund, pct_discount), COST_METRIC_KEYS,
+               ("COGS", "Fees", "Tax Owed", "Shipping", "Refunds", "Discounts")
+           )
+       ))
+       components.html(cost_html, height=440)
+
+   # Export Data Button
+   st.markdown("<br>", unsafe_allow_html=True)
+   st.markdown("---")
+
+   export_col1, export_col2, export_col3 = st.columns([1, 2, 1])
+   with export_col2:
+       st.markdown('<div style="text-align: center;">', unsafe_allow_html=True)
+
+       if st.button("📥 Export Filtered Data", use_container_width=True, type="primary"):
+           # Use the selected channels from the filter
+           selected_channels = channels if channels else list(APP_CONFIG.channels)
+
+           # Exports keep the legacy 'refund' column alongside refund_amount
+           df_export = df
+           if 'refund_amount' in df_export.columns and 'refund' not in df_export.columns:
+               df_export = df_export.copy()
+               df_export.insert(df_export.columns.get_loc('refund_amount') + 1, 'refund', df_export['refund_amount'])
+
+           # Round financial columns to 2 decimal places
+           financial_columns = ['cogs', 'platform_fee', 'shipping_cost', 'gross_profit', 'net_profit', 'revenue', 'discount', 'tax', 'refund']
+           df_export = df_export.assign(**{col: df_export[col].round(2) for col in financial_columns if col in df_export.columns})
+
+           # Generate CSV for each selected channel from a single groupby pass
+           channel_frames = dict(iter(df_export.groupby('channel', observed=True, sort=False)))
+           export_files = {}
+           for channel in selected_channels:
+               channel_df = channel_frames.get(channel)
+               if channel_df is not None and not channel_df.empty:
+                   # Encode straight into a bytes buffer rather than building a str first
+                   buf = io.BytesIO()
+                   channel_df.to_csv(buf, index=False, chunksize=100_000, encoding='utf-8')
+                   export_files[channel] = buf.getvalue()
+
+           # Create download buttons for each file
+           if export_files:
+               st.success(f"✅ Generated {len(export_files)} file(s)")
+
+               # Create columns for download buttons
+               if len(export_files) == 1:
+                   # Single file - centered button
+                   download_cols = st.columns([1, 2, 1])
+                   col_index = 1
+                   for channel, csv_data in export_files.items():
+                       with download_cols[col_index]:
+                           filename = f"{channel}_orders_{date_preset.lower().replace(' ', '_')}_{date_suffix}.csv"
+                           st.download_button(
+                               label=f"⬇️ Download {channel} Data",
+                               data=csv_data,
+                               file_name=filename,
+                               mime="text/csv",
+                               use_container_width=True
+                           )
+               else:
+                   # Multiple files - multiple buttons
+                   for channel, csv_data in export_files.items():
+                       filename = f"{channel}_orders_{date_preset.lower().replace(' ', '_')}_{date_suffix}.csv"
+                       st.download_button(
+                           label=f"⬇️ Download {channel} Data",
+                           data=csv_data,
+                           file_name=filename,
+                           mime="text/csv",
+                           use_container_width=True
+                       )
+           else:
+               st.warning("⚠️ No data available for selected filters")
+
+       st.markdown('</div>', unsafe_allow_html=True)
+
+
+def render_profitability(aggregates: Dict):
+   """Profitability tab: profit split, margin trend and waterfall."""
+   pc1, pc2 = st.columns(2)
+   with pc1:
+       st.markdown('<div class="chart-container"><div class="chart-header">Profit Distribution</div></div>', unsafe_allow_html=True)
+       st.plotly_chart(get_chart('profit_donut', aggregates['channel_totals']), use_container_width=True)
+   with pc2:
+       st.markdown('<div class="chart-container"><div class="chart-header">Margin Trends</div></div>', unsafe_allow_html=True)
+       st.plotly_chart(get_chart('profit_margin_trend', aggregates['daily_totals']), use_container_width=True)
+   st.markdown('<div class="chart-container"><div class="chart-header">Profit Waterfall</div></div>', unsafe_allow_html=True)
+   st.plotly_chart(get_chart('waterfall_profit', aggregates['waterfall_sums']), use_container_width=True)
+
+
+def render_products(aggregates: Dict):
+   """Products tab: top products chart and the per-product table."""
+   pr1, pr2 = st.columns([2, 1])
+   with pr1:
+       st.markdown('<div class="chart-container"><div class="chart-header">Top Products by Revenue</div></div>', unsafe_allow_html=True)
+       st.plotly_chart(get_chart('product_kpi', aggregates['product_totals']), use_container_width=True)
+   with pr2:
+       st.markdown('<div class="chart-container"><div class="chart-header">Product Details</div></div>', unsafe_allow_html=True)
+       prod_table = aggregates['product_totals'].rename(columns={'revenue': 'Sales', 'orders': 'Orders'}).sort_values('Sales', ascending=False)
+       # Format table to 2 decimals
+       st.dataframe(prod_table.style.format({'Sales': '${:,.2f}'}), use_container_width=True)
+
+
+def render_growth(df_full: pd.DataFrame):
+   """Growth tab: MoM/YoY cards and the monthly charts (always over the full history)."""
+   # Calculate Monthly Growth Data for cards
+   df_monthly = precompute_monthly_totals(df_full)
+   current_month = df_monthly.iloc[-1]
+   prev_month = df_monthly.iloc[-2]
+
+   # MoM calculations
+   mom_rev_growth = ((current_month['revenue'] - prev_month['revenue']) / prev_month['revenue']) * 100
+   mom_profit_growth = ((current_month['net_profit'] - prev_month['net_profit']) / prev_month['net_profit']) * 100
+
+   # YoY calculations (Year over Year), rolled up from the monthly totals
+   df_yearly = df_monthly.resample('Y', on='date').sum().reset_index()
+   if len(df_yearly) >= 2:
+       current_year = df_yearly.iloc[-1]
+       prev_year = df_yearly.iloc[-2]
+       yoy_rev_growth = ((current_year['revenue'] - prev_year['revenue']) / prev_year['revenue']) * 100
+       yoy_profit_growth = ((current_year['net_profit'] - prev_year['net_profit']) / prev_year['net_profit']) * 100
+   else:
+       # Not enough data for YoY, use annualized estimate
+       yoy_rev_growth = mom_rev_growth * 12  # Rough estimate
+       yoy_profit_growth = mom_profit_growth * 12
+
+   # Color Logic
+   rev_class = "g-pos" if mom_rev_growth >= 0 else "g-neg"
+   prof_class = "g-pos" if mom_profit_growth >= 0 else "g-neg"
+   yoy_rev_class = "g-pos" if yoy_rev_growth >= 0 else "g-neg"
+   yoy_prof_class = "g-pos" if yoy_profit_growth >= 0 else "g-neg"
+
+   g1, g2, g3, g4, g5 = st.columns(5)
+   with g1:
+       # MoM Revenue Card
+       html_g1 = growth_card_html(
+           "MoM Revenue Growth", f"{mom_rev_growth:+.2f}%",
+           f'<div class="growth-delta {rev_class}">Current: ${current_month["revenue"]:,.2f}</div>'
+       )
+       components.html(html_g1, height=130)
+   with g2:
+       # MoM Profit Card
+       html_g2 = growth_card_html(
+           "MoM Net Profit Growth", f"{mom_profit_growth:+.2f}%",
+           f'<div class="growth-delta {prof_class}">Current: ${current_month["net_profit"]:,.2f}</div>'
+       )
+       components.html(html_g2, height=130)
+   with g3:
+       # YoY Revenue Growth Card
+       html_g3 = growth_card_html(
+           "YoY Revenue Growth", f"{yoy_rev_growth:+.2f}%",
+           f'<div class="growth-delta {yoy_rev_class}">Year over Year</div>'
+       )
+       components.html(html_g3, height=130)
+   with g4:
+       # YoY Net Profit Growth Card
+       html_g4 = growth_card_html(
+           "YoY Net Profit Growth", f"{yoy_profit_growth:+.2f}%",
+           f'<div class="growth-delta {yoy_prof_class}">Year over Year</div>'
+       )
+       components.html(html_g4, height=130)
+   with g5:
+       # Projected Annual
+       projected = current_month['revenue'] * 12
+       html_g5 = growth_card_html(
+           "Annual Run Rate (Proj.)", f"${projected/1000:,.0f}K",
+           '<div style="color: #9CA3AF; font-size: 0.8rem; margin-top:5px;">Based on current month performance</div>'
+       )
+       components.html(html_g5, height=130)
+
+
+   # Growth Charts
+   gc1, gc2 = st.columns(2)
+   with gc1:
+       st.markdown('<div class="chart-container"><div class="chart-header">Revenue Velocity (Rev vs Growth %)</div></div>', unsafe_allow_html=True)
+       # We use df_full here to show the long term trend regardless of short filters
+       st.plotly_chart(get_chart('growth_velocity', df_monthly), use_container_width=True)
+      
+   with gc2:
+       st.markdown('<div class="chart-container"><div class="chart-header">Profitability Trajectory (Net Profit)</div></div>', unsafe_allow_html=True)
+       st.plotly_chart(get_chart('net_profit_trend', df_monthly), use_container_width=True)
+
+
+def render_unfulfilled(df_full: pd.DataFrame, now: pd.Timestamp, date_suffix: str):
+   """Unfulfilled Orders tab: summary metrics, breakdown charts and the order table."""
+   # Filter unfulfilled orders based on channel-specific criteria
+   df_unfulfilled = compute_unfulfilled(df_full)
+
+   # Summary metrics
+   st.markdown('<div class="chart-container"><div class="chart-header">Unfulfilled Orders Summary</div></div>', unsafe_allow_html=True)
+
+   uf1, uf2, uf3, uf4 = st.columns(4)
+   with uf1:
+       total_unfulfilled = len(df_unfulfilled)
+       st.metric("Total Unfulfilled Orders", f"{total_unfulfilled:,}")
+   with uf2:
+       total_value = df_unfulfilled['revenue'].sum()
+       st.metric("Total Value", f"${total_value:,.2f}")
+   with uf3:
+       avg_value = df_unfulfilled['revenue'].mean() if total_unfulfilled > 0 else 0
+       st.metric("Average Order Value", f"${avg_value:.2f}")
+   with uf4:
+       days_old = (now - df_unfulfilled['date'].min()).days if total_unfulfilled > 0 else 0
+       st.metric("Oldest Order Age", f"{days_old} days")
+
+   st.markdown("---")
+
+   # Channel breakdown
+   channel_counts, state_counts = unfulfilled_breakdown(df_unfulfilled)
+   uf_c1, uf_c2 = st.columns(2)
+
+   with uf_c1:
+       st.markdown('<div class="chart-container"><div class="chart-header">Unfulfilled Orders by Channel</div></div>', unsafe_allow_html=True)
+       if total_unfulfilled > 0:
+           st.plotly_chart(get_chart('unfulfilled_channel', channel_counts), use_container_width=True)
+       else:
+           st.info("✅ No unfulfilled orders!")
+
+   with uf_c2:
+       st.markdown('<div class="chart-container"><div class="chart-header">Unfulfilled Orders by State</div></div>', unsafe_allow_html=True)
+       if total_unfulfilled > 0:
+           st.plotly_chart(get_chart('unfulfilled_state', state_counts), use_container_width=True)
+       else:
+           st.info("✅ No unfulfilled orders!")
+
+   # Detailed table
+   st.markdown('<div class="chart-container"><div class="chart-header">Unfulfilled Orders Details</div></div>', unsafe_allow_html=True)
+
+   if total_unfulfilled > 0:
+       # Prepare table data with new columns
+       # Build column order: Date, Channel, Order ID, Customer Name, Address, City, Zip, State, Product, Value, Status
+       desired_order = [
+           'date', 'channel', 'order_id', 'customer_name',
+           'shipping_address', 'shipping_city', 'shipping_zipcode', 'state',
+           'products', 'revenue', 'financial_status'
+       ]
+
+       # Only include columns that exist in the dataframe
+       available_columns = [col for col in desired_order if col in df_unfulfilled.columns]
+
+       table_data = df_unfulfilled[available_columns].copy()
+       table_data['date'] = table_data['date'].dt.strftime('%Y-%m-%d')
+       table_data = table_data.sort_values('date', ascending=False)
+
+       # Build rename dictionary based on available columns
+       rename_dict = {
+           'date': 'Order Date',
+           'channel': 'Channel',
+           'order_id': 'Order ID',
+           'customer_name': 'Customer Name',
+           'shipping_address': 'Shipping Address',
+           'shipping_city': 'City',
+           'shipping_zipcode': 'Zip Code',
+           'state': 'State',
+           'products': 'Product',
+           'revenue': 'Value',
+           'financial_status': 'Status'
+       }
+
+       # Only rename columns that exist in the dataframe
+       rename_dict_filtered = {k: v for k, v in rename_dict.items() if k in table_data.columns}
+       table_data = table_data.rename(columns=rename_dict_filtered)
+
+       # Display with styling
+       st.dataframe(
+           table_data.style.format({'Value': '${:,.2f}'}),
+           use_container_width=True,
+           height=400
+       )
+
+       # Export button
+       csv = table_data.to_csv(index=False)
+       st.download_button(
+           label="📥 Download Unfulfilled Orders CSV",
+           data=csv,
+           file_name=f"unfulfilled_orders_{date_suffix}.csv",
+           mime="text/csv"
+       )
+   else:
+       st.success("🎉 All orders have been fulfilled!")
 
 
 # --- MAIN LAYOUT ---
@@ -801,11 +1600,6 @@ def main():
    if not check_password():
        st.stop()  # Stop execution if password is incorrect
 
-   # Clear Streamlit cache on first load to ensure fresh data from Supabase
-   if 'cache_cleared' not in st.session_state:
-       st.cache_data.clear()
-       st.session_state.cache_cleared = True
-
    # Data Processing with professional loading screen
    # Load data from Supabase if available, otherwise use sample data
    if 'data_loaded' not in st.session_state:
@@ -851,30 +1645,17 @@ def main():
            </div>
        """, unsafe_allow_html=True)
 
-       if SUPABASE_AVAILABLE:
-           df_full = fetch_all_order_data()
-           if df_full is None or df_full.empty:
-               df_full = generate_sample_data()
-       else:
-           df_full = generate_sample_data()
+       load_order_data()
 
        st.session_state['data_loaded'] = True
-       st.session_state['df_full'] = df_full
        st.rerun()
 
    # Once data is loaded, show the dashboard
    load_css()
 
-   # Use cached data for seamless experience
-   df_full = st.session_state.get('df_full')
-   if df_full is None or df_full.empty:
-       if SUPABASE_AVAILABLE:
-           df_full = fetch_all_order_data()
-           if df_full is None or df_full.empty:
-               df_full = generate_sample_data()
-       else:
-           df_full = generate_sample_data()
-       st.session_state['df_full'] = df_full
+   # Read through the shared cache on every rerun (not a per-session copy), so
+   # once the 5-minute TTL lapses the next rerun gets a new load and data_version
+   df_full = load_order_data()
 
    # 1. Header: Title (Left) | Logo & Status (Right)
    col_head1, col_head2 = st.columns([2, 1])
@@ -892,10 +1673,14 @@ def main():
        </div>
        ''', unsafe_allow_html=True)
 
-   st.markdown('<div class="title-spacer"></div>', unsafe_allow_html=True)
+       # Fetch fresh orders now instead of waiting for the 5-minute cache to expire
+       if SUPABASE_AVAILABLE and st.button("🔄 Refresh Data", key="refresh_data"):
+           load_order_data.clear()
+           clear_order_data_cache()
+           clear_frame_caches()
+           st.rerun()
 
-   # Store unfiltered data for later use
-   df_unfiltered = df_full.copy()
+   st.markdown('<div class="title-spacer"></div>', unsafe_allow_html=True)
 
    # 2. Filters and Tabs Row - Centered between horizontal lines
    st.markdown('<div style="border-top: 1px solid rgba(255, 255, 255, 0.1); margin: 1.5rem 0 0 0;"></div>', unsafe_allow_html=True)
@@ -923,8 +1708,8 @@ def main():
    with filter_col3:
        channels = st.multiselect(
            "Channels",
-           ['Shopify', 'Walmart', 'Amazon'],
-           default=['Shopify', 'Walmart', 'Amazon'],
+           list(APP_CONFIG.channels),
+           default=list(APP_CONFIG.channels),
            label_visibility="collapsed",
            placeholder="Channel"
        )
@@ -939,41 +1724,25 @@ def main():
 
    st.markdown('<div style="border-bottom: 1px solid rgba(255, 255, 255, 0.1); margin: 0 0 1.5rem 0;"></div>', unsafe_allow_html=True)
 
+   # Read the clock once per rerun; the date window, file names and order ages all use it
+   now = pd.Timestamp.now()
+   date_suffix = now.strftime("%Y%m%d")
+
    # Filter Logic applied to df for the Charts
    # IMPORTANT: If searching for a specific order, skip date filtering
-   if order_search and order_search.strip():
-       # When searching for an order, use all data (ignore date preset)
-       df = df_full.copy()
-       search_term = order_search.strip()
-       # Search in order_id column (which contains order numbers for all channels)
-       df = df[df['order_id'].astype(str).str.contains(search_term, case=False, na=False)]
+   search_term = order_search.strip() if order_search else ''
+   if search_term or date_preset == "All":
+       start = end = None
    else:
-       # Normal date filtering when not searching for a specific order
-       if date_preset == "All":
-           df = df_full.copy()  # Use all data
-       elif date_preset == "Last 7 Days":
-           date_range = (datetime.now() - timedelta(days=7), datetime.now())
-           start, end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
-           df = df_full[(df_full['date'] >= start) & (df_full['date'] <= end)]
-       elif date_preset == "Last 30 Days":
-           date_range = (datetime.now() - timedelta(days=30), datetime.now())
-           start, end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
-           df = df_full[(df_full['date'] >= start) & (df_full['date'] <= end)]
-       elif date_preset == "Last 90 Days":
-           date_range = (datetime.now() - timedelta(days=90), datetime.now())
-           start, end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
-           df = df_full[(df_full['date'] >= start) & (df_full['date'] <= end)]
-       else:  # Custom
-           date_range = (datetime.now() - timedelta(days=30), datetime.now())
-           start, end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
-           df = df_full[(df_full['date'] >= start) & (df_full['date'] <= end)]
+       # Custom falls back to the last 30 days
+       delta = APP_CONFIG.date_preset_deltas.get(date_preset, APP_CONFIG.date_preset_deltas["Last 30 Days"])
+       # Window ends on the next whole minute, so the cached filter result is
+       # reused for reruns within that minute
+       end = now.ceil('min')
+       start = end - delta
+   df = apply_filters(df_full, start, end, tuple(channels), search_term)
 
-   # Apply channel filter
-   if channels:
-       df = df[df['channel'].isin(channels)]
-
-   # Recalculate metrics for the filtered view
-   metrics_filtered = calculate_metrics(df)
+   aggregates = precompute_aggregates(df)
 
    # Calculate KPI metrics for last 30 days with filtered data
    # UNLESS we're searching for a specific order - then show that order's metrics
@@ -981,442 +1750,57 @@ def main():
        # When searching for a specific order, use all matching orders (don't filter by date)
        df_curr = df
        df_prev = pd.DataFrame()  # No previous period for single order search
-       metrics = calculate_metrics(df_curr, df_prev)
+       metrics = cached_metrics(df_curr, df_prev)
    else:
        # Normal date range filtering for KPIs
-       end_date = df['date'].max()
+       end_date = aggregates['last_date']
        start_date = end_date - timedelta(days=30)
        prev_start = start_date - timedelta(days=30)
 
-       df_curr = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
-       df_prev = df[(df['date'] >= prev_start) & (df['date'] < start_date)]
-       metrics = calculate_metrics(df_curr, df_prev)
-
-   # Helper function for delta formatting
-   def format_delta_html(delta: float):
-       css_class = "delta-pos" if delta >= 0 else "delta-neg"
-       sign = "+" if delta >= 0 else ""
-       return f'<div class="metric-delta {css_class}">{sign}{delta:.2f}% vs prev</div>'
+       df_curr = slice_dates(df, start_date, end_date)
+       df_prev = slice_dates(df, prev_start, start_date, include_end=False)
+       metrics = cached_metrics(df_curr, df_prev)
 
    # 3. Top KPI Cards (Now dynamic with filters)
    kpi_height = 200
    k1, k2, k3 = st.columns(3)
 
+   # Deltas and circle percentages are shown to 2 decimals, so round them for the cache key
    with k1:
-       html_k1 = f"""{KPI_CSS}
-       <div class="metric-card-combined">
-           <div class="metric-main-content">
-               <div class="metric-label">TOTAL REVENUE</div>
-               <div class="metric-value">${metrics['total_revenue']:,.2f}</div>
-               {format_delta_html(metrics.get('total_revenue_delta', 0))}
-               <div class="metric-sub-label">Net: {format_currency_smart(metrics['net_revenue'])}</div>
-           </div>
-           {get_top_kpi_circle(metrics['refund_rate'], "Refund Rate", "#2DD4BF")}
-       </div>"""
+       html_k1 = kpi_card_html(
+           "TOTAL REVENUE", f"${metrics['total_revenue']:,.2f}", round(metrics.get('total_revenue_delta', 0), 2),
+           f"Net: {format_currency_smart(metrics['net_revenue'])}", round(metrics['refund_rate'], 2), "Refund Rate", "#2DD4BF"
+       )
        components.html(html_k1, height=kpi_height)
 
    with k2:
        margin_pct = metrics['net_margin']
-       html_k2 = f"""{KPI_CSS}
-       <div class="metric-card-combined">
-           <div class="metric-main-content">
-               <div class="metric-label">NET PROFIT</div>
-               <div class="metric-value">${metrics['net_profit']:,.2f}</div>
-               {format_delta_html(metrics.get('net_profit_delta', 0))}
-               <div class="metric-sub-label">Gross: {format_currency_smart(metrics['gross_profit'])}</div>
-           </div>
-           {get_top_kpi_circle(margin_pct, "Net Margin", "#818CF8")}
-       </div>"""
+       html_k2 = kpi_card_html(
+           "NET PROFIT", f"${metrics['net_profit']:,.2f}", round(metrics.get('net_profit_delta', 0), 2),
+           f"Gross: {format_currency_smart(metrics['gross_profit'])}", round(margin_pct, 2), "Net Margin", "#818CF8"
+       )
        components.html(html_k2, height=kpi_height)
 
    with k3:
        aov_target = min((metrics['avg_order_value'] / 250) * 100, 100)
-       html_k3 = f"""{KPI_CSS}
-       <div class="metric-card-combined">
-           <div class="metric-main-content">
-               <div class="metric-label">TOTAL ORDERS</div>
-               <div class="metric-value">{metrics['total_orders']:,}</div>
-               {format_delta_html(metrics.get('total_orders_delta', 0))}
-               <div class="metric-sub-label">Avg: ${metrics['avg_order_value']:.2f}</div>
-           </div>
-           {get_top_kpi_circle(aov_target, "AOV Goal", "#34D399")}
-       </div>"""
+       html_k3 = kpi_card_html(
+           "TOTAL ORDERS", f"{metrics['total_orders']:,}", round(metrics.get('total_orders_delta', 0), 2),
+           f"Avg: ${metrics['avg_order_value']:.2f}", round(aov_target, 2), "AOV Goal", "#34D399"
+       )
        components.html(html_k3, height=kpi_height)
 
    st.markdown("---")
 
-   # 4. Content based on tab selection (using if/elif instead of st.tabs)
-   # We'll define tab variables for backward compatibility
-   tab_overview = tab_selection == "Overview"
-   tab_profit = tab_selection == "Profitability"
-   tab_products = tab_selection == "Products"
-   tab_growth = tab_selection == "Growth"
-   tab_unfulfilled = tab_selection == "Unfulfilled Orders"
-
-
-   # --- OVERVIEW TAB ---
-   if tab_overview:
-       r1_c1, r1_c2 = st.columns([2, 1])
-       with r1_c1:
-           st.markdown('<div class="chart-container"><div class="chart-header">Revenue Trend</div></div>', unsafe_allow_html=True)
-           st.plotly_chart(chart_revenue_trend(df), use_container_width=True, config={'displayModeBar': False})
-       with r1_c2:
-           st.markdown('<div class="chart-container"><div class="chart-header">Orders by State</div></div>', unsafe_allow_html=True)
-           st.plotly_chart(chart_heatmap(df), use_container_width=True, config={'displayModeBar': False})
-          
-       r2_c1, r2_c2 = st.columns([2, 1.2])
-       with r2_c1:
-           st.markdown('<div class="chart-container"><div class="chart-header">Channel Revenue Split</div></div>', unsafe_allow_html=True)
-           st.plotly_chart(chart_channel_bar(df), use_container_width=True, config={'displayModeBar': False})
-       with r2_c2:
-           rev = metrics_filtered['total_revenue'] if metrics_filtered['total_revenue'] > 0 else 1
-           pct_cogs = (metrics_filtered['total_cogs'] / rev) * 100
-           pct_fees = (metrics_filtered['total_fees'] / rev) * 100
-           pct_tax = (metrics_filtered['total_tax_owed'] / rev) * 100
-           pct_ship = (metrics_filtered['total_shipping'] / rev) * 100
-           pct_refund = (metrics_filtered['total_refunds'] / rev) * 100
-           pct_discount = (metrics_filtered['total_discounts'] / rev) * 100
-
-           # Formatted to 2 decimals
-           cost_html = f"""{KPI_CSS}
-           <div class="cost-panel-container">
-               <div class="cost-header">Cost Breakdown</div>
-               <div class="kpi-row">
-                   {get_cost_circle(pct_cogs, format_currency_smart(metrics_filtered['total_cogs']), "COGS", "#2DD4BF")}
-                   {get_cost_circle(pct_fees, format_currency_smart(metrics_filtered['total_fees']), "Fees", "#2DD4BF")}
-                   {get_cost_circle(pct_tax, format_currency_smart(metrics_filtered['total_tax_owed']), "Tax Owed", "#2DD4BF")}
-               </div>
-               <div class="cost-header">Data Summary</div>
-               <div class="kpi-row">
-                   {get_cost_circle(pct_ship, format_currency_smart(metrics_filtered['total_shipping']), "Shipping", "#2DD4BF")}
-                   {get_cost_circle(pct_refund, format_currency_smart(metrics_filtered['total_refunds']), "Refunds", "#2DD4BF")}
-                   {get_cost_circle(pct_discount, format_currency_smart(metrics_filtered['total_discounts']), "Discounts", "#2DD4BF")}
-               </div>
-           </div>"""
-           components.html(cost_html, height=440)
-
-       # Export Data Button
-       st.markdown("<br>", unsafe_allow_html=True)
-       st.markdown("---")
-
-       export_col1, export_col2, export_col3 = st.columns([1, 2, 1])
-       with export_col2:
-           st.markdown('<div style="text-align: center;">', unsafe_allow_html=True)
-
-           if st.button("📥 Export Filtered Data", use_container_width=True, type="primary"):
-               # Use the selected channels from the filter
-               selected_channels = channels if channels else ["Shopify", "Walmart", "Amazon"]
-
-               # Generate CSV for each selected channel
-               export_files = {}
-               for channel in selected_channels:
-                   channel_df = df[df['channel'] == channel].copy()
-
-                   if not channel_df.empty:
-                       # Round financial columns to 2 decimal places
-                       financial_columns = ['cogs', 'platform_fee', 'shipping_cost', 'gross_profit', 'net_profit', 'revenue', 'discount', 'tax', 'refund']
-                       for col in financial_columns:
-                           if col in channel_df.columns:
-                               channel_df[col] = channel_df[col].round(2)
-
-                       # Convert to CSV
-                       csv_data = channel_df.to_csv(index=False)
-                       export_files[channel] = csv_data
-
-               # Create download buttons for each file
-               if export_files:
-                   st.success(f"✅ Generated {len(export_files)} file(s)")
-
-                   # Create columns for download buttons
-                   if len(export_files) == 1:
-                       # Single file - centered button
-                       download_cols = st.columns([1, 2, 1])
-                       col_index = 1
-                       for channel, csv_data in export_files.items():
-                           with download_cols[col_index]:
-                               date_suffix = datetime.now().strftime("%Y%m%d")
-                               filename = f"{channel}_orders_{date_preset.lower().replace(' ', '_')}_{date_suffix}.csv"
-                               st.download_button(
-                                   label=f"⬇️ Download {channel} Data",
-                                   data=csv_data,
-                                   file_name=filename,
-                                   mime="text/csv",
-                                   use_container_width=True
-                               )
-                   else:
-                       # Multiple files - multiple buttons
-                       for channel, csv_data in export_files.items():
-                           date_suffix = datetime.now().strftime("%Y%m%d")
-                           filename = f"{channel}_orders_{date_preset.lower().replace(' ', '_')}_{date_suffix}.csv"
-                           st.download_button(
-                               label=f"⬇️ Download {channel} Data",
-                               data=csv_data,
-                               file_name=filename,
-                               mime="text/csv",
-                               use_container_width=True
-                           )
-               else:
-                   st.warning("⚠️ No data available for selected filters")
-
-           st.markdown('</div>', unsafe_allow_html=True)
-
-
-   # --- PROFITABILITY TAB ---
-   if tab_profit:
-       pc1, pc2 = st.columns(2)
-       with pc1:
-           st.markdown('<div class="chart-container"><div class="chart-header">Profit Distribution</div></div>', unsafe_allow_html=True)
-           st.plotly_chart(chart_profit_donut(df), use_container_width=True)
-       with pc2:
-           st.markdown('<div class="chart-container"><div class="chart-header">Margin Trends</div></div>', unsafe_allow_html=True)
-           st.plotly_chart(chart_profit_margin_trend(df), use_container_width=True)
-       st.markdown('<div class="chart-container"><div class="chart-header">Profit Waterfall</div></div>', unsafe_allow_html=True)
-       st.plotly_chart(chart_waterfall_profit(df), use_container_width=True)
-
-
-   # --- PRODUCTS TAB ---
-   if tab_products:
-       pr1, pr2 = st.columns([2, 1])
-       with pr1:
-           st.markdown('<div class="chart-container"><div class="chart-header">Top Products by Revenue</div></div>', unsafe_allow_html=True)
-           st.plotly_chart(chart_product_kpi(df), use_container_width=True)
-       with pr2:
-           st.markdown('<div class="chart-container"><div class="chart-header">Product Details</div></div>', unsafe_allow_html=True)
-           prod_table = df.groupby('products').agg({'revenue': 'sum', 'date': 'count'}).rename(columns={'revenue': 'Sales', 'date': 'Orders'}).sort_values('Sales', ascending=False)
-           # Format table to 2 decimals
-           st.dataframe(prod_table.style.format({'Sales': '${:,.2f}'}), use_container_width=True)
-
-
-   # --- GROWTH TAB (REVISED FOR CEO) ---
-   if tab_growth:
-       # Calculate Monthly Growth Data for cards
-       df_monthly = df_full.set_index('date').resample('M').agg({'revenue': 'sum', 'net_profit': 'sum'}).reset_index()
-       current_month = df_monthly.iloc[-1]
-       prev_month = df_monthly.iloc[-2]
-
-       # MoM calculations
-       mom_rev_growth = ((current_month['revenue'] - prev_month['revenue']) / prev_month['revenue']) * 100
-       mom_profit_growth = ((current_month['net_profit'] - prev_month['net_profit']) / prev_month['net_profit']) * 100
-
-       # YoY calculations (Year over Year)
-       df_yearly = df_full.set_index('date').resample('Y').agg({'revenue': 'sum', 'net_profit': 'sum'}).reset_index()
-       if len(df_yearly) >= 2:
-           current_year = df_yearly.iloc[-1]
-           prev_year = df_yearly.iloc[-2]
-           yoy_rev_growth = ((current_year['revenue'] - prev_year['revenue']) / prev_year['revenue']) * 100
-           yoy_profit_growth = ((current_year['net_profit'] - prev_year['net_profit']) / prev_year['net_profit']) * 100
-       else:
-           # Not enough data for YoY, use annualized estimate
-           yoy_rev_growth = mom_rev_growth * 12  # Rough estimate
-           yoy_profit_growth = mom_profit_growth * 12
-
-       # Color Logic
-       rev_class = "g-pos" if mom_rev_growth >= 0 else "g-neg"
-       prof_class = "g-pos" if mom_profit_growth >= 0 else "g-neg"
-       yoy_rev_class = "g-pos" if yoy_rev_growth >= 0 else "g-neg"
-       yoy_prof_class = "g-pos" if yoy_profit_growth >= 0 else "g-neg"
-
-       g1, g2, g3, g4, g5 = st.columns(5)
-       with g1:
-           # MoM Revenue Card
-           html_g1 = f"""{KPI_CSS}
-           <div class="growth-kpi-container">
-               <div class="growth-title">MoM Revenue Growth</div>
-               <div class="growth-value">{mom_rev_growth:+.2f}%</div>
-               <div class="growth-delta {rev_class}">Current: ${current_month['revenue']:,.2f}</div>
-           </div>
-           """
-           components.html(html_g1, height=130)
-       with g2:
-           # MoM Profit Card
-           html_g2 = f"""{KPI_CSS}
-           <div class="growth-kpi-container">
-               <div class="growth-title">MoM Net Profit Growth</div>
-               <div class="growth-value">{mom_profit_growth:+.2f}%</div>
-               <div class="growth-delta {prof_class}">Current: ${current_month['net_profit']:,.2f}</div>
-           </div>
-           """
-           components.html(html_g2, height=130)
-       with g3:
-           # YoY Revenue Growth Card
-           html_g3 = f"""{KPI_CSS}
-           <div class="growth-kpi-container">
-               <div class="growth-title">YoY Revenue Growth</div>
-               <div class="growth-value">{yoy_rev_growth:+.2f}%</div>
-               <div class="growth-delta {yoy_rev_class}">Year over Year</div>
-           </div>
-           """
-           components.html(html_g3, height=130)
-       with g4:
-           # YoY Net Profit Growth Card
-           html_g4 = f"""{KPI_CSS}
-           <div class="growth-kpi-container">
-               <div class="growth-title">YoY Net Profit Growth</div>
-               <div class="growth-value">{yoy_profit_growth:+.2f}%</div>
-               <div class="growth-delta {yoy_prof_class}">Year over Year</div>
-           </div>
-           """
-           components.html(html_g4, height=130)
-       with g5:
-           # Projected Annual
-           projected = current_month['revenue'] * 12
-           html_g5 = f"""{KPI_CSS}
-           <div class="growth-kpi-container">
-               <div class="growth-title">Annual Run Rate (Proj.)</div>
-               <div class="growth-value">${projected/1000:,.0f}K</div>
-               <div style="color: #9CA3AF; font-size: 0.8rem; margin-top:5px;">Based on current month performance</div>
-           </div>
-           """
-           components.html(html_g5, height=130)
-
-
-       # Growth Charts
-       gc1, gc2 = st.columns(2)
-       with gc1:
-           st.markdown('<div class="chart-container"><div class="chart-header">Revenue Velocity (Rev vs Growth %)</div></div>', unsafe_allow_html=True)
-           # We use df_full here to show the long term trend regardless of short filters
-           st.plotly_chart(chart_growth_velocity(df_full), use_container_width=True)
-          
-       with gc2:
-           st.markdown('<div class="chart-container"><div class="chart-header">Profitability Trajectory (Net Profit)</div></div>', unsafe_allow_html=True)
-           st.plotly_chart(chart_net_profit_trend(df_full), use_container_width=True)
-
-
-   # --- UNFULFILLED ORDERS TAB ---
-   if tab_unfulfilled:
-       # Filter unfulfilled orders based on channel-specific criteria
-       df_shopify = df_full[df_full['channel'] == 'Shopify']
-       df_walmart = df_full[df_full['channel'] == 'Walmart']
-       df_amazon = df_full[df_full['channel'] == 'Amazon']
-
-       # Shopify: shipping_terms not null AND financial_status='paid' AND fulfillment_status='unfulfilled'
-       shopify_unfulfilled = df_shopify[
-           (df_shopify['shipping_terms'].notna()) &
-           (df_shopify['shipping_terms'] != 'None') &
-           (df_shopify['financial_status'] == 'paid') &
-           (df_shopify['fulfillment_status'] == 'unfulfilled')
-       ]
-
-       # Amazon: order_status='Pending'
-       amazon_unfulfilled = df_amazon[df_amazon['order_status'] == 'Pending']
-
-       # Walmart: fulfillment_status NOT IN ('Delivered', 'Shipped', 'Cancelled')
-       walmart_unfulfilled = df_walmart[
-           ~df_walmart['fulfillment_status'].isin(['Delivered', 'Shipped', 'Cancelled'])
-       ]
-
-       # Combine all unfulfilled orders
-       df_unfulfilled = pd.concat([shopify_unfulfilled, amazon_unfulfilled, walmart_unfulfilled], ignore_index=True)
-
-       # Summary metrics
-       st.markdown('<div class="chart-container"><div class="chart-header">Unfulfilled Orders Summary</div></div>', unsafe_allow_html=True)
-
-       uf1, uf2, uf3, uf4 = st.columns(4)
-       with uf1:
-           total_unfulfilled = len(df_unfulfilled)
-           st.metric("Total Unfulfilled Orders", f"{total_unfulfilled:,}")
-       with uf2:
-           total_value = df_unfulfilled['revenue'].sum()
-           st.metric("Total Value", f"${total_value:,.2f}")
-       with uf3:
-           avg_value = df_unfulfilled['revenue'].mean() if total_unfulfilled > 0 else 0
-           st.metric("Average Order Value", f"${avg_value:.2f}")
-       with uf4:
-           oldest_order = df_unfulfilled['date'].min() if total_unfulfilled > 0 else datetime.now()
-           days_old = (datetime.now() - pd.to_datetime(oldest_order)).days if total_unfulfilled > 0 else 0
-           st.metric("Oldest Order Age", f"{days_old} days")
-
-       st.markdown("---")
-
-       # Channel breakdown
-       uf_c1, uf_c2 = st.columns(2)
-
-       with uf_c1:
-           st.markdown('<div class="chart-container"><div class="chart-header">Unfulfilled Orders by Channel</div></div>', unsafe_allow_html=True)
-           if total_unfulfilled > 0:
-               channel_counts = df_unfulfilled.groupby('channel').agg({
-                   'revenue': 'sum',
-                   'order_id': 'count'
-               }).rename(columns={'order_id': 'count'}).reset_index()
-
-               fig = px.bar(channel_counts, x='channel', y='count', color='channel',
-                           color_discrete_map={'Shopify': '#2DD4BF', 'Walmart': '#818CF8', 'Amazon': '#FF9900'},
-                           text='count')
-               fig.update_traces(textposition="outside", hovertemplate='%{x}<br>Orders: %{y}<extra></extra>')
-               fig.update_layout(showlegend=False)
-               st.plotly_chart(apply_chart_theme(fig, height=300), use_container_width=True)
-           else:
-               st.info("✅ No unfulfilled orders!")
-
-       with uf_c2:
-           st.markdown('<div class="chart-container"><div class="chart-header">Unfulfilled Orders by State</div></div>', unsafe_allow_html=True)
-           if total_unfulfilled > 0:
-               state_counts = df_unfulfilled.groupby('state').size().sort_values(ascending=False).head(10).reset_index()
-               state_counts.columns = ['state', 'count']
-
-               fig = px.bar(state_counts, x='state', y='count', color='count',
-                           color_continuous_scale="Tealgrn", text='count')
-               fig.update_traces(textposition="outside", hovertemplate='%{x}<br>Orders: %{y}<extra></extra>')
-               fig.update_layout(showlegend=False)
-               st.plotly_chart(apply_chart_theme(fig, height=300), use_container_width=True)
-           else:
-               st.info("✅ No unfulfilled orders!")
-
-       # Detailed table
-       st.markdown('<div class="chart-container"><div class="chart-header">Unfulfilled Orders Details</div></div>', unsafe_allow_html=True)
-
-       if total_unfulfilled > 0:
-           # Prepare table data with new columns
-           # Build column order: Date, Channel, Order ID, Customer Name, Address, City, Zip, State, Product, Value, Status
-           desired_order = [
-               'date', 'channel', 'order_id', 'customer_name',
-               'shipping_address', 'shipping_city', 'shipping_zipcode', 'state',
-               'products', 'revenue', 'financial_status'
-           ]
-
-           # Only include columns that exist in the dataframe
-           available_columns = [col for col in desired_order if col in df_unfulfilled.columns]
-
-           table_data = df_unfulfilled[available_columns].copy()
-           table_data['date'] = table_data['date'].dt.strftime('%Y-%m-%d')
-           table_data = table_data.sort_values('date', ascending=False)
-
-           # Build rename dictionary based on available columns
-           rename_dict = {
-               'date': 'Order Date',
-               'channel': 'Channel',
-               'order_id': 'Order ID',
-               'customer_name': 'Customer Name',
-               'shipping_address': 'Shipping Address',
-               'shipping_city': 'City',
-               'shipping_zipcode': 'Zip Code',
-               'state': 'State',
-               'products': 'Product',
-               'revenue': 'Value',
-               'financial_status': 'Status'
-           }
-
-           # Only rename columns that exist in the dataframe
-           rename_dict_filtered = {k: v for k, v in rename_dict.items() if k in table_data.columns}
-           table_data = table_data.rename(columns=rename_dict_filtered)
-
-           # Display with styling
-           st.dataframe(
-               table_data.style.format({'Value': '${:,.2f}'}),
-               use_container_width=True,
-               height=400
-           )
-
-           # Export button
-           csv = table_data.to_csv(index=False)
-           st.download_button(
-               label="📥 Download Unfulfilled Orders CSV",
-               data=csv,
-               file_name=f"unfulfilled_orders_{datetime.now().strftime('%Y%m%d')}.csv",
-               mime="text/csv"
-           )
-       else:
-           st.success("🎉 All orders have been fulfilled!")
+   # 4. Content based on tab selection (using a radio instead of st.tabs);
+   # only the selected tab's renderer runs
+   tab_renderers = {
+       "Overview": lambda: render_overview(df, aggregates, channels, date_preset, date_suffix),
+       "Profitability": lambda: render_profitability(aggregates),
+       "Products": lambda: render_products(aggregates),
+       "Growth": lambda: render_growth(df_full),
+       "Unfulfilled Orders": lambda: render_unfulfilled(df_full, now, date_suffix),
+   }
+   tab_renderers[tab_selection]()
 
 
 if __name__ == "__main__":